@@ -18,7 +18,7 @@ class PublicationHarvester(metaclass=abc.ABCMeta):
 
 
     @abc.abstractmethod
-    def harvest(self, query: str, db_collection: str) -> None:
+    def harvest(self, query: str, db_collection: str, state=None) -> None:
         '''
         This procedure harvests publications containing a
         specified search term using the provided API
@@ -27,6 +27,8 @@ class PublicationHarvester(metaclass=abc.ABCMeta):
         :type query: str
         :param db_collection: Database table name to store the publications in.
         :type db_collection: MongoDB collection instance
+        :param state: Harvest state to resume from and to update.
+        :type state: HarvestStateCollection
         :returns: None
         :rtype: None
         '''
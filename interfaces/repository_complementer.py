@@ -68,6 +68,20 @@ class RepositoryComplementer(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+    def prefetch(self, names: [str]) -> None:
+        '''
+        The method may request the information of several repositories
+        in advance, so the following calls for these repositories are
+        answered without further requests. By default nothing is requested.
+
+        :param names: Repository names.
+        :type names: [str]
+        :returns: None
+        :rtype: None
+        '''
+        return None
+
+
     @abc.abstractmethod
     def get_first_commit(self, name: str, num_requests: int) -> (bool, str, str, int):
         '''
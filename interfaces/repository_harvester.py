@@ -55,11 +55,13 @@ class RepositoryHarvester(metaclass=abc.ABCMeta):
 
 
     @abc.abstractmethod
-    def create_interval(self, start: str, end: str, delta: str) -> str:
+    def create_interval(self, start: str, end: str, delta: str,
+                        completed_until: str = None) -> str:
         '''
         The generator method creates search intervals
         for the given period, the latest end date for the intervals is
-        today and the generator stops.
+        today and the generator stops. If a watermark is given, the
+        period starts the day after it.
 
         :param start: start date of the search period.
         :type start: str
@@ -67,6 +69,8 @@ class RepositoryHarvester(metaclass=abc.ABCMeta):
         :type end: str
         :param delta: size of the search intervals.
         :type delta: str
+        :param completed_until: date until all intervals are harvested.
+        :type completed_until: str
         :returns: time interval.
         :rtype: str
         :raises: ValueError.
@@ -90,6 +94,96 @@ class RepositoryHarvester(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+    def search_intervals(self, key: str, start: str, end: str, delta: str,
+                         completed_until: str = None, resume: str = None):
+        '''
+        The generator method requests the first result page of the search
+        term for each search interval. By default the search intervals of
+        create_interval are used, their boundaries do not change, so the
+        interrupted interval needs no resuming.
+
+        :param key: search term.
+        :type key: str
+        :param start: start date of the search period.
+        :type start: str
+        :param end: end date of the search period.
+        :type end: str
+        :param delta: size of the search intervals.
+        :type delta: str
+        :param completed_until: date until all intervals are harvested.
+        :type completed_until: str
+        :param resume: interval in progress, that starts after the watermark.
+        :type resume: str
+        :returns: search interval and the response of its first page.
+        :rtype: (str, requests.models.Response)
+        '''
+        for interval in self.create_interval(start, end, delta, completed_until):
+            yield interval, self.get_search_results(-1, None, key, interval)
+
+
+    def get_search_pages(self, response: requests.models.Response, skip: [str] = ()):
+        '''
+        The generator method returns the result pages of a search query,
+        starting with the given first page. By default the pages are
+        requested one after another, following the link to the next page.
+        Pages already stored are not returned. A page, whose request failed,
+        is returned as None with its URL, or without URL if the first page
+        failed, and ends the search query, so the caller may repeat it.
+
+        :param response: first result page or None.
+        :type response: requests.models.Response
+        :param skip: URLs of the pages already stored.
+        :type skip: [str]
+        :returns: URL and result page or None.
+        :rtype: (str, requests.models.Response)
+        '''
+        if not response:
+            yield None, None
+            return
+        while True:
+            if response.url not in skip:
+                yield response.url, response
+            if 'link' not in response.headers:
+                return
+            next_url = self.get_next_page(response.headers['link'].split(','))
+            if not next_url:
+                return
+            response = self.get_search_results(-1, next_url, None, None)
+            if not response:
+                yield next_url, None
+                return
+
+
+    def plan_queries(self, keywords: [str]) -> [(str, [str])]:
+        '''
+        The method may merge compatible search terms into one search query.
+        By default each search term is searched on its own.
+
+        :param keywords: search terms.
+        :type keywords: [str]
+        :returns: search queries with the search terms they cover.
+        :rtype: [(str, [str])]
+        '''
+        return [(key, [key]) for key in keywords]
+
+
+    def match_keywords(self, item: dict, keywords: [str], readme: str = None) -> [str]:
+        '''
+        The method returns the search terms of a merged search query, that
+        a search result matches. By default all search terms are returned.
+
+        :param item: search result.
+        :type item: dict
+        :param keywords: search terms of the search query.
+        :type keywords: [str]
+        :param readme: Readme file of the repository, if available.
+        :type readme: str
+        :returns: matching search terms.
+        :rtype: [str]
+        '''
+        return list(keywords)
+
+
     @abc.abstractmethod
     def get_search_results(self, remaining_requests: int, next_url: str,
                            key: str, interval: str) -> requests.models.Response:
@@ -132,4 +226,19 @@ class RepositoryHarvester(metaclass=abc.ABCMeta):
         :rtype: requests.models.Response
         '''
         raise NotImplementedError
- 
\ No newline at end of file
+ 
+
+
+    def get_readme_response(self, name: str) -> requests.models.Response:
+        '''
+        The method requests the Readme file of a repository and returns the
+        response with any status code, so a missing Readme file (404) is
+        told from a failed request. By default the response of
+        get_api_response is returned, which is None for all failed requests.
+
+        :param name: Repository id or full name.
+        :type name: str
+        :returns: HTTPs response or None.
+        :rtype: requests.models.Response
+        '''
+        return self.get_api_response('readme', name, -1, None)[0]
@@ -2,9 +2,9 @@
 
 import time
 from datetime import datetime
-import requests
 import feedparser
 from interfaces.publication_harvester import PublicationHarvester
+from modules.http_session import get_session
 
 
 class ArXivHarvester(PublicationHarvester):
@@ -30,6 +30,10 @@ class ArXivHarvester(PublicationHarvester):
 
     # base arXiv API url
     BASE_URL = 'http://export.arxiv.org/api/query?search_query=all:'
+    # sort order of the results, new publications are appended at the end
+    SORT = '&sortBy=submittedDate&sortOrder=ascending'
+    # maximum number of attempts for a request returning no results
+    MAX_ATTEMPTS = 3
 
     def __init__(self, start=0, results_per_iteration=500, wait_time=5):
         '''
@@ -41,7 +45,7 @@ class ArXivHarvester(PublicationHarvester):
         self.wait_time = wait_time
 
 
-    def harvest(self, query, db_collection):
+    def harvest(self, query, db_collection, state=None):
         """
         This procedure harvests publications on arXiv containing a specified search
         term using the provided API.
@@ -56,87 +60,131 @@ class ArXivHarvester(PublicationHarvester):
             https://static.arxiv.org/static/arxiv.marxdown/0.1/help/api/examples/python_arXiv_paging_example.txt
             https://static.arxiv.org/static/arxiv.marxdown/0.1/help/api/examples/python_arXiv_parsing_example.txt
 
+        The results are sorted by their submission date, so new publications
+        are appended at the end. If a harvest state is given, the harvest
+        starts at the stored offset and the offset is updated after each
+        stored slice, so only new publications are requested by a repeated
+        harvest. Publications already stored are not added again.
+
         :param query: search term.
         :type query: str
         :param db_collection: Database table name to store the publications in.
         :type db_collection: MongoDB collection instance
+        :param state: Harvest state to resume from and to update.
+        :type state: HarvestStateCollection
         """
 
         # get max num results
-        response = requests.get(
-            self.BASE_URL+query+'&start=0&max_results=1')
+        response = get_session().get(
+            self.BASE_URL+query+self.SORT+'&start=0&max_results=1')
         feed = feedparser.parse(response.text)
         total_results = int(feed.feed.opensearch_totalresults)
         time.sleep(self.wait_time)
         print("Number of total results: ", total_results)
 
-        for i in range(self.start, total_results, self.results_per_iteration):
+        i = self.start
+        if state:
+            i = max(i, state.get_state('arxiv', query).get('offset', 0))
+        attempts = 0
+        while i < total_results:
             print("Results %i - %i" % (i, i+self.results_per_iteration))
-            current_query = '%s&start=%i&max_results=%i' % (query,
-                                                            i,
-                                                            self.results_per_iteration)
-            response = requests.get(self.BASE_URL+current_query)
+            current_query = '%s%s&start=%i&max_results=%i' % (query,
+                                                              self.SORT,
+                                                              i,
+                                                              self.results_per_iteration)
+            response = get_session().get(self.BASE_URL+current_query)
 
             feed = feedparser.parse(response.text)
 
-            # Iterate over the returned entries
-            for entry in feed.entries:
-                link = ''
-                pdf_url = ''
-                doi_url = ''
-                doi = ''
-
-                ident = entry.id.rsplit('arxiv.org/abs/', 1)[1]
-
-                # get the links to the abs page and pdf for this e-print
-                for link in entry.links:
-                    if link.rel == 'alternate':
-                        link = link.href
-                    elif link.title == 'pdf':
-                        pdf_url = link.href
-                    elif link.title == 'doi':
-                        doi_url = link.href
-                        doi = doi_url.rsplit('doi.org/', 1)[1]
-
-                # get the journal reference
-                try:
-                    journal_ref = entry.arxiv_journal_ref
-                except AttributeError:
-                    journal_ref = 'No journal ref found'
-
-                # get the primary category of the entry
-                primary_category = entry.tags[0]['term']
-
-                # get all categories of the entry
-                all_cat = [t['term'] for t in entry.tags]
-                all_categories = (', ').join(all_cat)
-
-                # get the summary, summary_detail
-                summary = entry.summary if hasattr(entry,'summary') else ''
-                sum_detail = entry.summary_detail['value'] if hasattr(entry,
-                                                                      'summary_detail') else ''
-                comment = entry.arxiv_comment if hasattr(entry, 'arxiv_comment') else ''
-
-                # store metadata of each publication in db
-                post = {"source": "arxiv",
-                        "request_date": datetime.now(),
-                        "arxiv_id": ident,
-                        "doi": doi,
-                        "title": entry.title,
-                        "published": entry.published,
-                        "updated": entry.updated,
-                        "url": entry.id,
-                        "DOI_url": doi_url,
-                        "pdf_url": pdf_url,
-                        "primary_category": primary_category,
-                        "all_categories": all_categories,
-                        "journal_ref": journal_ref,
-                        "total_citations": None,
-                        "total_downloads": None,
-                        "summary": summary,
-                        "summary_detail": sum_detail,
-                        "arxiv_comment": comment
-                        }
-                db_collection.save(post)
+            # the API occasionally returns an empty slice, which is requested again
+            if not feed.entries:
+                attempts = attempts + 1
+                if attempts >= self.MAX_ATTEMPTS:
+                    print('No results returned, the harvest stops at', i)
+                    return
+                time.sleep(self.wait_time)
+                continue
+            attempts = 0
+
+            # store the returned entries with one bulk operation
+            with db_collection.bulk():
+                self.__save_entries(feed.entries, db_collection)
+            i = i + len(feed.entries)
+            if state:
+                state.save_offset('arxiv', query, i)
 
             time.sleep(self.wait_time)
+
+
+    @staticmethod
+    def __save_entries(entries, db_collection):
+        """
+        The method stores the metadata of the returned publications,
+        publications already stored are not added again.
+
+        :param entries: returned publications.
+        :type entries: [feedparser.FeedParserDict]
+        :param db_collection: Database table name to store the publications in.
+        :type db_collection: MongoDB collection instance
+        :returns: None
+        :rtype: None
+        """
+
+        for entry in entries:
+            link = ''
+            pdf_url = ''
+            doi_url = ''
+            doi = ''
+
+            ident = entry.id.rsplit('arxiv.org/abs/', 1)[1]
+
+            # get the links to the abs page and pdf for this e-print
+            for link in entry.links:
+                if link.rel == 'alternate':
+                    link = link.href
+                elif link.title == 'pdf':
+                    pdf_url = link.href
+                elif link.title == 'doi':
+                    doi_url = link.href
+                    doi = doi_url.rsplit('doi.org/', 1)[1]
+
+            # get the journal reference
+            try:
+                journal_ref = entry.arxiv_journal_ref
+            except AttributeError:
+                journal_ref = 'No journal ref found'
+
+            # get the primary category of the entry
+            primary_category = entry.tags[0]['term']
+
+            # get all categories of the entry
+            all_cat = [t['term'] for t in entry.tags]
+            all_categories = (', ').join(all_cat)
+
+            # get the summary, summary_detail
+            summary = entry.summary if hasattr(entry,'summary') else ''
+            sum_detail = entry.summary_detail['value'] if hasattr(entry,
+                                                                  'summary_detail') else ''
+            comment = entry.arxiv_comment if hasattr(entry, 'arxiv_comment') else ''
+
+            # store metadata of each publication in db
+            post = {"source": "arxiv",
+                    "request_date": datetime.now(),
+                    "arxiv_id": ident,
+                    "doi": doi,
+                    "title": entry.title,
+                    "published": entry.published,
+                    "updated": entry.updated,
+                    "url": entry.id,
+                    "DOI_url": doi_url,
+                    "pdf_url": pdf_url,
+                    "primary_category": primary_category,
+                    "all_categories": all_categories,
+                    "journal_ref": journal_ref,
+                    "total_citations": None,
+                    "total_downloads": None,
+                    "summary": summary,
+                    "summary_detail": sum_detail,
+                    "arxiv_comment": comment
+                    }
+            db_collection.save_once({'arxiv_id': ident}, post)
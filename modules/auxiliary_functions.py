@@ -1,13 +1,58 @@
 ''' auxiliary functions '''
 
 import re
+from bisect import bisect_right
+
+
+# DOI name, blanks before and after the forward slash are allowed
+DOI_PATTERN = re.compile(r'(10 ?\. ?[0-9]{4,}(?:[.][0-9]+)* ?/ ?[-._;()/:A-Za-z0-9]+)')
+# short DOI name, e.g. doi.org/abc12 or doi:10/abc12
+SHORT_DOI_PATTERN = re.compile(
+    r'((?:doi\.org| 10|doi\.org/10|doi ?: ?10)/(?!10)[a-zA-Z0-9]+)[`\s><.)]')
+# extensions of pdf and image links, that are not part of a DOI name
+IGNORED_DOI_SUFFIXES = ('.pdf', '.svg')
+# separator of the joined strings, that no DOI name contains or ends with
+TEXT_SEPARATOR = '\x00'
+
+
+def _clean_doi(doi):
+    '''
+    The function converts the DOI name to lowercase letters and removes
+    the extension of a pdf or image link.
+
+    :param doi: found DOI name.
+    :type doi: str.
+    :returns: cleaned DOI name.
+    :rtype: str.
+    '''
+
+    doi = doi.lower()
+    for suffix in IGNORED_DOI_SUFFIXES:
+        if doi.endswith(suffix):
+            return doi[:-len(suffix)]
+    return doi
+
+
+def _may_contain_doi(fragment):
+    '''
+    The function checks, if the given string contains the literals '10' or
+    'doi.org', without them it cannot contain a DOI name.
+
+    :param fragment: string to lookup DOI names and short DOI names.
+    :type fragment: str.
+    :returns: True if a DOI name is possible.
+    :rtype: bool.
+    '''
+    return '10' in fragment or 'doi.org' in fragment
 
 
 def extract_doi(fragment):
     '''
     The function searches in the given string valid DOI names. A DOI name
     is case insensitive. To avoid duplicates all uppercase letters converted
-    to lowercase letters.
+    to lowercase letters. Strings without the literals '10' and 'doi.org'
+    cannot contain a DOI name and are skipped without a regular expression
+    search.
 
     :param fragment: string to lookup DOI names and short DOI names.
     :type fragment: str.
@@ -16,31 +61,59 @@ def extract_doi(fragment):
     :raises: AttributeError, KeyError
     '''
 
-    ignored_suffixes = ['.pdf', '.svg']
-    dois = []
-    # extract the DOI reference from the description and Readme file
-    # new general pattern that allows blanks before and after the forward slash
-    general_pattern = r'(10 ?\. ?[0-9]{4,}(?:[.][0-9]+)* ?/ ?[-._;()/:A-Za-z0-9]+)'
-    short_pattern = r'((?:doi\.org| 10|doi\.org/10|doi ?: ?10)/(?!10)[a-zA-Z0-9]+)[`\s><.)]'
+    if not _may_contain_doi(fragment):
+        return []
 
-    list_of_dois = re.findall(general_pattern, fragment)
+    # extract the DOI reference from the description and Readme file
     # some doi names are part of a pdf link and have a not required extension, which is cleared
-    for doi in list_of_dois:
-        doi = doi.lower()
-        appended = False
-        for suffix in ignored_suffixes:
-            if doi.endswith(suffix):
-                dois.append(doi[:-len(suffix)])
-                appended = True
-        if not appended:
-            dois.append(doi)
-    list_of_dois = re.findall(short_pattern, fragment)
-    for doi in list_of_dois:
-        doi = doi.lower()
-        dois.append('10/' + doi.rsplit('/', 1)[1])
+    dois = [_clean_doi(doi) for doi in DOI_PATTERN.findall(fragment)]
+    for doi in SHORT_DOI_PATTERN.findall(fragment):
+        dois.append('10/' + doi.lower().rsplit('/', 1)[1])
     return dois
 
 
+def extract_dois(texts):
+    '''
+    The function searches valid DOI names in each of the given strings,
+    e.g. the descriptions and Readme files of many repositories, and
+    returns the same DOIs as extract_doi for each string. Empty strings,
+    None, and strings without a possible DOI name are skipped, the others
+    are joined, so each regular expression searches the batch only once.
+    The found DOIs are assigned to the strings by their positions.
+
+    :param texts: strings to lookup DOI names and short DOI names.
+    :type texts: iterable of str.
+    :returns: list of found DOIs for each string.
+    :rtype: [[str]].
+    '''
+
+    texts = list(texts)
+    results = [[] for _ in texts]
+    indices = [index for index, text in enumerate(texts)
+               if text and _may_contain_doi(text)]
+    if not indices:
+        return results
+
+    # start positions of the strings in the joined batch
+    offsets = []
+    position = 0
+    for index in indices:
+        offsets.append(position)
+        position = position + len(texts[index]) + len(TEXT_SEPARATOR)
+    batch = TEXT_SEPARATOR.join(texts[index] for index in indices)
+
+    short_dois = [[] for _ in texts]
+    for match in DOI_PATTERN.finditer(batch):
+        index = indices[bisect_right(offsets, match.start()) - 1]
+        results[index].append(_clean_doi(match.group(1)))
+    for match in SHORT_DOI_PATTERN.finditer(batch):
+        index = indices[bisect_right(offsets, match.start()) - 1]
+        short_dois[index].append('10/' + match.group(1).lower().rsplit('/', 1)[1])
+    for index in indices:
+        results[index].extend(short_dois[index])
+    return results
+
+
 def create_reference_entry(publication, include_doi):
     '''
     Checks the given identifier of a publication and
@@ -0,0 +1,344 @@
+''' This module contains the CrossrefClient class
+    see class doc for more information '''
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+import requests
+import modules.auxiliary_functions as aux
+from modules.http_session import get_session
+from modules.rate_limiter import RateLimiter, get_retry_after
+
+
+class CrossrefClient():
+    '''
+
+    .. class:: CrossrefClient
+
+    The CrossrefClient class requests the metadata of DOIs from the Crossref
+    REST API. The DOIs are looked up in batches with the filter of the works
+    endpoint, e.g. works?filter=doi:10.1/a,doi:10.1/b, and the batches are
+    requested concurrently by a pool of threads, which share one rate limiter.
+    DOIs, that are not found in a batch, are resolved one by one: an alias is
+    looked up in the DOI handle system, otherwise non alphanumeric suffixes
+    are removed, see auxiliary_functions.check_name_suffix. With a mailto
+    address the requests are served by the polite pool of Crossref. If the
+    service is overloaded (429, 5xx), all threads back off for a time, which
+    is doubled with every further overload response and reset by the next
+    successful response. The DOI handle system has its own back off, while
+    it is overloaded only the alias lookups wait, the requests to Crossref
+    continue. If a request still fails after MAX_ATTEMPTS, the
+    lookup of the DOI fails as a whole: its result is None, nothing is
+    cached and no suffix is removed, so it may be looked up again later.
+    With a DOI cache the results of the lookups, also negative ones, are
+    stored and taken from the cache, before the network is requested.
+
+    :param mailto: contact address for the polite pool.
+    :type mailto: str
+    :param workers: number of concurrent requests.
+    :type workers: int
+    :param batch_size: number of DOIs per filter request.
+    :type batch_size: int
+    :param url: base URL of the API, e.g. a local stub server for tests.
+    :type url: str
+    :param header: additional request header, e.g. a Crossref Plus token.
+    :type header: dict
+    :param cache: cache of the DOI lookups.
+    :type cache: DoiCacheCollection
+    '''
+
+    # Crossref REST API url
+    API_URL = 'https://api.crossref.org/'
+    # DOI handle API url, to look up aliases
+    HANDLE_URL = 'https://doi.org/api/handles/'
+    # rate limit in requests per window in seconds, updated by the responses
+    RATE_LIMIT = (50, 1)
+    # status codes of an overloaded service, the request is repeated
+    RETRY_STATUS = [429, 500, 502, 503, 504]
+    # first and maximum back off in seconds
+    BACKOFF = (1, 300)
+    # maximum number of attempts of a request
+    MAX_ATTEMPTS = 8
+
+
+    def __init__(self, mailto=None, workers=3, batch_size=20, url=None, header=None,
+                 cache=None):
+        '''
+        Constructor method
+        '''
+
+        self.mailto = mailto
+        self.workers = workers
+        self.batch_size = batch_size
+        self.url = url if url else self.API_URL
+        self.header = dict(header or {})
+        self.header['User-Agent'] = ('rsps (https://github.com/ceiho/rsps'
+                                     + ('; mailto:' + mailto if mailto else '') + ')')
+        self.rate_limiter = RateLimiter(*self.RATE_LIMIT, burst=workers)
+        self.backoff = self.BACKOFF[0]
+        self.handle_backoff = self.BACKOFF[0]
+        self.lock = threading.Lock()
+        self.cache = cache
+
+
+    def _back_off(self, response, limited=True):
+        '''
+        The method backs off after an overload response or a connection
+        error, for the time given by Retry-After or the current back off,
+        which is doubled for the next overload. For Crossref the requests
+        of all threads are blocked by the rate limiter, requests, that do
+        not count against the rate limit, e.g. to the DOI handle system,
+        use their own back off and only the requesting thread waits.
+
+        :param response: overload response or None for a connection error.
+        :type response: requests.models.Response
+        :param limited: flag whether the request counts against the Crossref rate limit.
+        :type limited: bool
+        :returns: back off in seconds.
+        :rtype: float
+        '''
+
+        with self.lock:
+            backoff = self.backoff if limited else self.handle_backoff
+            wait = get_retry_after(response.headers) if response is not None else None
+            if wait is None:
+                wait = backoff * (1 + random.random() / 2)
+            backoff = min(backoff * 2, self.BACKOFF[1])
+            if limited:
+                self.backoff = backoff
+            else:
+                self.handle_backoff = backoff
+        if limited:
+            self.rate_limiter.block(wait)
+        else:
+            time.sleep(wait)
+        return wait
+
+
+    def _get(self, url, params=None, limited=True):
+        '''
+        The method sends a GET request, after the rate limiter released it.
+        Overload responses and connection errors are retried after backing
+        off, up to MAX_ATTEMPTS times. Requests, that do not count against
+        the rate limit, e.g. to the DOI handle system, are not paced and
+        back off without blocking the Crossref requests.
+
+        :param url: requested URL.
+        :type url: str
+        :param params: query parameters.
+        :type params: dict
+        :param limited: flag whether the request counts against the Crossref rate limit.
+        :type limited: bool
+        :returns: response.
+        :rtype: requests.models.Response
+        :raises: requests.exceptions.RetryError, if all attempts failed.
+        '''
+
+        params = dict(params or {})
+        if self.mailto and limited:
+            params['mailto'] = self.mailto
+        for _ in range(self.MAX_ATTEMPTS):
+            if limited:
+                self.rate_limiter.acquire()
+            try:
+                response = get_session().get(url, params=params, headers=self.header)
+            except requests.exceptions.RequestException as error:
+                print('Request failed:', error)
+                response = None
+            if response is not None and limited:
+                self.rate_limiter.update(response.headers)
+            if response is None or response.status_code in self.RETRY_STATUS:
+                self._back_off(response, limited)
+                continue
+            with self.lock:
+                if limited:
+                    self.backoff = self.BACKOFF[0]
+                else:
+                    self.handle_backoff = self.BACKOFF[0]
+            return response
+        raise requests.exceptions.RetryError('%i attempts to request %s failed'
+                                             % (self.MAX_ATTEMPTS, url))
+
+
+    def get_works(self, dois):
+        '''
+        The method requests the metadata of several DOIs with one filter
+        request. DOIs containing a comma cannot be filtered and are
+        requested one by one, as well as all DOIs, if the filter request
+        is rejected, e.g. because of an invalid DOI.
+
+        :param dois: DOI names.
+        :type dois: [str]
+        :returns: metadata of the found DOIs, keyed by the lowercase DOI.
+        :rtype: dict
+        :raises: requests.exceptions.RequestException, if a request failed.
+        '''
+
+        works = {}
+        if self.cache:
+            cached = self.cache.get_results('works', dois)
+            works = {key: entry['value'] for key, entry in cached.items()
+                     if entry['status'] == 200}
+            dois = [doi for doi in dois if self.cache.normalize(doi) not in cached]
+        batch = [doi for doi in dois if ',' not in doi]
+        single = [doi for doi in dois if ',' in doi]
+        if batch:
+            response = self._get(self.url + 'works',
+                                 {'filter': ','.join('doi:' + doi for doi in batch),
+                                  'rows': len(batch)})
+            if response.status_code == 200:
+                for item in response.json()['message']['items']:
+                    works[item['DOI'].lower()] = item
+                if self.cache:
+                    for doi in batch:
+                        work = works.get(doi.lower())
+                        self.cache.save_result('works', doi, 200 if work else 404, work)
+            else:
+                single = dois
+        for doi in single:
+            work = self.get_work(doi)
+            if work:
+                works[doi.lower()] = work
+        return works
+
+
+    def get_work(self, doi):
+        '''
+        The method requests the metadata of a DOI.
+
+        :param doi: DOI name.
+        :type doi: str
+        :returns: metadata or None, if the DOI is not found.
+        :rtype: dict
+        :raises: requests.exceptions.RequestException, if the request failed.
+        '''
+
+        if self.cache:
+            cached = self.cache.get_results('works', [doi])
+            if cached:
+                return next(iter(cached.values()))['value']
+        response = self._get(self.url + 'works/' + quote(doi, safe='/:;()'))
+        work = response.json()['message'] if response.status_code == 200 else None
+        if self.cache:
+            self.cache.save_result('works', doi, response.status_code, work)
+        return work
+
+
+    def get_alias(self, doi):
+        '''
+        The method looks up the alias of a DOI in the DOI handle system.
+
+        :param doi: DOI name.
+        :type doi: str
+        :returns: alias or None.
+        :rtype: str
+        :raises: requests.exceptions.RequestException, if the request failed.
+        '''
+
+        if self.cache:
+            cached = self.cache.get_results('alias', [doi])
+            if cached:
+                return next(iter(cached.values()))['value']
+        response = self._get(self.HANDLE_URL + quote(doi, safe='/:;()'), limited=False)
+        alias = []
+        if response.status_code == 200:
+            alias = [elem['data']['value'] for elem in response.json().get('values', [])
+                     if elem['type'] == 'HS_ALIAS']
+        if self.cache:
+            self.cache.save_result('alias', doi, response.status_code,
+                                   alias[0] if alias else None)
+        return alias[0] if alias else None
+
+
+    def resolve(self, doi, is_known=None):
+        '''
+        The method resolves a DOI, that was not found, by its alias or by
+        removing non alphanumeric suffixes. If a truncated DOI is already
+        known, e.g. in the research software artifact collection, the
+        resolution stops.
+
+        :param doi: DOI name.
+        :type doi: str
+        :param is_known: function checking whether a truncated DOI is known.
+        :type is_known: function
+        :returns: result with the resolved DOI, its metadata, and the known flag.
+        :rtype: dict
+        :raises: requests.exceptions.RequestException, if a request failed.
+        '''
+
+        result = {'doi': doi, 'message': None, 'known': False}
+        last_doi = ''
+        name = doi
+        while name:
+            if name != doi:
+                work = self.get_work(name)
+                if work:
+                    return dict(result, doi=name, message=work)
+            alias = self.get_alias(name)
+            if alias and last_doi != alias:
+                last_doi = name
+                name = alias
+                continue
+            name = aux.check_name_suffix(name)
+            if name and is_known and is_known(name):
+                return dict(result, doi=name, known=True)
+        return result
+
+
+    def _resolve_batch(self, dois, is_known):
+        '''
+        The method looks up a batch of DOIs and resolves the DOIs, that
+        were not found. If a request fails, the result of the affected
+        DOIs is None, all DOIs of the batch, if the batch lookup fails.
+
+        :param dois: DOI names.
+        :type dois: [str]
+        :param is_known: function checking whether a truncated DOI is known.
+        :type is_known: function
+        :returns: result of each DOI or None.
+        :rtype: [dict]
+        '''
+
+        try:
+            works = self.get_works(dois)
+        except requests.exceptions.RequestException as error:
+            print('Lookup of', len(dois), 'DOIs failed:', error)
+            return [None] * len(dois)
+        results = []
+        for doi in dois:
+            if doi.lower() in works:
+                results.append({'doi': doi, 'message': works[doi.lower()], 'known': False})
+                continue
+            try:
+                results.append(self.resolve(doi, is_known))
+            except requests.exceptions.RequestException as error:
+                print('Lookup of', doi, 'failed:', error)
+                results.append(None)
+        return results
+
+
+    def resolve_all(self, dois, is_known=None):
+        '''
+        The generator method resolves the DOIs in concurrently requested
+        batches and yields the results in the order of the DOIs. The result
+        of a DOI contains the resolved DOI, which differs from the given one
+        for aliases and truncated DOIs, its metadata or None, and the flag
+        whether the truncated DOI is already known. If the lookup of a DOI
+        failed, its result is None.
+
+        :param dois: DOI names.
+        :type dois: [str]
+        :param is_known: function checking whether a truncated DOI is known.
+        :type is_known: function
+        :returns: given DOI and its result or None.
+        :rtype: str, dict
+        '''
+
+        batches = [dois[start:start + self.batch_size]
+                   for start in range(0, len(dois), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch, results in zip(batches, executor.map(
+                    lambda batch: self._resolve_batch(batch, is_known), batches)):
+                yield from zip(batch, results)
@@ -3,12 +3,18 @@ Database class
 '''
 
 import subprocess
+import socket
+import threading
+import time
+import uuid
 from io import BytesIO
 from urllib.request import urlopen
 from zipfile import ZipFile
-from os import path
+from os import path, getpid
 import json
-from pymongo import MongoClient
+from datetime import datetime, timedelta
+from pymongo import MongoClient, UpdateOne, DeleteMany, IndexModel, ASCENDING, HASHED, ReturnDocument
+from pymongo.errors import OperationFailure
 import yaml
 
 
@@ -22,17 +28,59 @@ class _Database():
     database are created, it is not initialized.
     '''
 
+    CLIENT = None
     DATABASE = None
     DATABASE_NAME = None
+    # database parameters of the configuration file
+    PARAMS = None
+    # process the client was created in
+    PID = None
 
     @staticmethod
-    def initialize(name):
+    def initialize(params):
+        '''
+        The method initializes the connection to MongoDB. One client,
+        and thereby one connection pool, is shared by all collections
+        of a process. The host and the client options, e.g. pool size,
+        timeouts, read and write concerns, and wire compression, are
+        taken from the database parameters of the configuration file.
+        A forked worker process creates its own client, as the
+        connections of the parent process must not be reused.
+
+        :param params: Database parameters of the configuration file.
+        :type params: dict
+        :returns: None.
+        :rtype: None
+        '''
+
+        if _Database.CLIENT is None or _Database.PID != getpid():
+            connection = params.get('connection') or {}
+            options = {option: value
+                       for option, value in (connection.get('options') or {}).items()
+                       if value is not None}
+            _Database.CLIENT = MongoClient(
+                connection.get('host', 'mongodb://localhost:27017'), **options)
+            _Database.PID = getpid()
+        _Database.PARAMS = params
+        _Database.DATABASE_NAME = params['name']
+        _Database.DATABASE = _Database.CLIENT[params['name']]
+
+
+    @staticmethod
+    def get_collection(collection):
         '''
-        The method initializes the connection to MongoDB and
-        checks whether the specified database tables exist.
+        Returns the database collection of the shared client. If the
+        client was created in another process, a new one is created.
+
+        :param collection: Database collection name.
+        :type collection: str
+        :returns: Database collection.
+        :rtype: pymongo.collection.Collection
         '''
-        _Database.DATABASE_NAME = name
-        _Database.DATABASE = getattr(MongoClient('localhost', 27017), name)
+
+        if _Database.PID != getpid():
+            _Database.initialize(_Database.PARAMS)
+        return _Database.DATABASE[collection]
 
 
     @staticmethod
@@ -47,7 +95,7 @@ class _Database():
         :returns: Result message.
         :rtype: pymongo.results.InsertOneResult
         '''
-        _Database.DATABASE[collection].insert_one(data)
+        _Database.get_collection(collection).insert_one(data)
 
 
     @staticmethod
@@ -63,7 +111,7 @@ class _Database():
         :returns: Number of documents meeting the characteristics.
         :rtype: int
         '''
-        return _Database.DATABASE[collection].count_documents(query)
+        return _Database.get_collection(collection).count_documents(query)
 
 
     @staticmethod
@@ -79,11 +127,11 @@ class _Database():
         :returns: Documents meeting the characteristics.
         :rtype: pymongo.cursor.Cursor
         '''
-        return _Database.DATABASE[collection].find(query)
+        return _Database.get_collection(collection).find(query)
 
 
     @staticmethod
-    def find_with_batch_size(collection, query, size):
+    def find_with_batch_size(collection, query, size, projection=None, sort=None, limit=0):
         '''
         Returns the documents from the database table
         with the specified characteristics.
@@ -94,14 +142,21 @@ class _Database():
         :type query: dict
         :param size: Batch size.
         :type size: int
+        :param projection: Fields to be returned, all fields if None.
+        :type projection: dict | [str]
+        :param sort: Fields and directions to sort the documents by.
+        :type sort: [(str, int)]
+        :param limit: Maximum number of documents, no limit if 0.
+        :type limit: int
         :returns: Documents meeting the characteristics.
         :rtype: pymongo.cursor.Cursor
         '''
-        return _Database.DATABASE[collection].find(query, batch_size=size)
+        return _Database.get_collection(collection).find(query, projection, sort=sort,
+                                                         limit=limit, batch_size=size)
 
 
     @staticmethod
-    def aggregate(collection, features):
+    def aggregate(collection, features, allow_disk_use=False):
         '''
         Returns the documents matching the features.
 
@@ -109,14 +164,17 @@ class _Database():
         :type collection: pymongo.collection.Collection
         :param features: Characteristics to be met by the documents.
         :type features: [dict]
+        :param allow_disk_use: Allow stages to write temporary files.
+        :type allow_disk_use: bool
         :returns: Sorted documents matching the characteristics.
         :rtype: pymongo.cursor.Cursor
         '''
-        return _Database.DATABASE[collection].aggregate(features)
+        return _Database.get_collection(collection).aggregate(features,
+                                                              allowDiskUse=allow_disk_use)
 
 
     @staticmethod
-    def find_one(collection, query):
+    def find_one(collection, query, projection=None):
         '''
         Returns one document from the database table
         with the specified characteristics.
@@ -125,10 +183,12 @@ class _Database():
         :type collection: pymongo.collection.Collection
         :param query: Characteristics to be met by the document.
         :type query: dict
+        :param projection: Fields to be returned, all fields if None.
+        :type projection: dict | [str]
         :returns: Document meeting the characteristics.
         :rtype: pymongo.cursor.Cursor
         '''
-        return _Database.DATABASE[collection].find_one(query)
+        return _Database.get_collection(collection).find_one(query, projection)
 
 
     @staticmethod
@@ -146,7 +206,25 @@ class _Database():
         :returns: Result message.
         :rtype: pymongo.results.UpdateResult
         '''
-        _Database.DATABASE[collection].update_one(ident, query)
+        return _Database.get_collection(collection).update_one(ident, query)
+
+
+    @staticmethod
+    def update_many(collection, query, update):
+        '''
+        Modifies all documents in the database table
+        corresponding to the specified characteristics.
+
+        :param collection: Database collection.
+        :type collection: pymongo.collection.Collection
+        :param query: Characteristics to be met by the documents.
+        :type query: dict
+        :param update: Fields to be updated.
+        :type update: dict
+        :returns: Result message.
+        :rtype: pymongo.results.UpdateResult
+        '''
+        return _Database.get_collection(collection).update_many(query, update)
 
 
     @staticmethod
@@ -162,7 +240,28 @@ class _Database():
         :returns: Result message.
         :rtype: pymongo.results.DeleteResult
         '''
-        _Database.DATABASE[collection].delete_one(query)
+        _Database.get_collection(collection).delete_one(query)
+
+
+    @staticmethod
+    def find_one_and_update(collection, query, update, sort=None):
+        '''
+        Modifies one document with the specified characteristics
+        atomically and returns the modified document.
+
+        :param collection: Database collection.
+        :type collection: pymongo.collection.Collection
+        :param query: Characteristics to be met by the document.
+        :type query: dict
+        :param update: Fields to be updated.
+        :type update: dict
+        :param sort: Order, in which the first matching document is chosen.
+        :type sort: [(str, int)]
+        :returns: Modified document or None.
+        :rtype: dict
+        '''
+        return _Database.get_collection(collection).find_one_and_update(
+            query, update, sort=sort, return_document=ReturnDocument.AFTER)
 
 
     @staticmethod
@@ -178,7 +277,123 @@ class _Database():
         :returns: Result message.
         :rtype: pymongo.results.DeleteResult
         '''
-        _Database.DATABASE[collection].delete_many(query)
+        _Database.get_collection(collection).delete_many(query)
+
+
+    @staticmethod
+    def bulk_write(collection, requests):
+        '''
+        Sends the write operations to the database table
+        as one unordered bulk operation.
+
+        :param collection: Database collection.
+        :type collection: pymongo.collection.Collection
+        :param requests: Write operations to be executed.
+        :type requests: [pymongo.operations.UpdateOne]
+        :returns: Result message.
+        :rtype: pymongo.results.BulkWriteResult
+        '''
+        return _Database.get_collection(collection).bulk_write(requests, ordered=False)
+
+
+    @staticmethod
+    def create_indexes(collection, indexes):
+        '''
+        Creates the indexes in the database table, existing
+        indexes with the same specification are left untouched.
+
+        :param collection: Database collection.
+        :type collection: pymongo.collection.Collection
+        :param indexes: Index specifications.
+        :type indexes: [pymongo.operations.IndexModel]
+        :returns: Names of the indexes.
+        :rtype: [str]
+        '''
+        return _Database.get_collection(collection).create_indexes(indexes)
+
+
+    @staticmethod
+    def index_information(collection):
+        '''
+        Returns the indexes of the database table.
+
+        :param collection: Database collection.
+        :type collection: pymongo.collection.Collection
+        :returns: Index names with their specification.
+        :rtype: dict
+        '''
+        return _Database.get_collection(collection).index_information()
+
+
+
+class BulkWriter():
+    '''
+
+    .. class:: BulkWriter
+
+    The BulkWriter class buffers the write operations of a collection
+    and sends them as one unordered bulk operation, when the number of
+    buffered operations reaches the given size, when it is flushed
+    explicitly, or when the with-block is left.
+
+    :param collection: Collection whose write operations are buffered.
+    :type collection: Collection
+    :param size: Maximum number of buffered operations.
+    :type size: int
+    '''
+
+    def __init__(self, collection, size=1000):
+        '''
+        Constructor
+        '''
+        self.collection = collection
+        self.size = size
+        self.operations = []
+        self.previous = None
+
+
+    def __enter__(self):
+        self.previous = self.collection.writer
+        self.collection.writer = self
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # the buffered operations are sent even if the block is left
+        # with an exception, so the work done so far is not lost
+        try:
+            self.flush()
+        finally:
+            self.collection.writer = self.previous
+        return False
+
+
+    def add(self, operation):
+        '''
+        Buffers the write operation and flushes the buffer if
+        it reached its maximum size.
+
+        :param operation: Write operation.
+        :type operation: pymongo.operations.UpdateOne
+        :returns: None.
+        :rtype: None
+        '''
+        self.operations.append(operation)
+        if len(self.operations) >= self.size:
+            self.flush()
+
+
+    def flush(self):
+        '''
+        Sends all buffered write operations to the database table.
+
+        :returns: None.
+        :rtype: None
+        '''
+        if self.operations:
+            operations = self.operations
+            self.operations = []
+            _Database.bulk_write(self.collection.collection_name, operations)
 
 
 
@@ -194,6 +409,58 @@ class Collection():
     :type mode: str
     '''
 
+    # indexes for the query patterns of the harvesting and identification
+    # steps, specified for each intended purpose of a collection. The
+    # "not yet processed" flags are queried with {'$exists': False}, which
+    # cannot be expressed by a partial filter and is not supported by
+    # sparse indexes, so they get regular indexes, where missing fields
+    # are indexed as null. Readme files exceed the index key size, hence
+    # only their hash is indexed, which supports the {'readme': None} query.
+    INDEXES = {
+        'repositories': [
+            IndexModel([('id', ASCENDING)]),
+            IndexModel([('full_name', ASCENDING)]),
+            IndexModel([('readme', HASHED)])],
+        'publications': [
+            IndexModel([('doi', ASCENDING)]),
+            IndexModel([('arxiv_id', ASCENDING)])],
+        'rs_repositories': [
+            IndexModel([('id', ASCENDING)]),
+            IndexModel([('full_name', ASCENDING)]),
+            IndexModel([('references.id', ASCENDING)]),
+            IndexModel([('first_commit', ASCENDING)]),
+            IndexModel([('checked_content', ASCENDING), ('language', ASCENDING)]),
+            IndexModel([('checked_subject', ASCENDING), ('references.mode', ASCENDING)]),
+            IndexModel([('group', ASCENDING)]),
+            IndexModel([('main_subject', ASCENDING)])],
+        'rs_publications': [
+            IndexModel([('identifier.id', ASCENDING)]),
+            IndexModel([('checked_doi', ASCENDING)],
+                       partialFilterExpression={'identifier.mode': 'doi'})],
+        'publication_subjects': [
+            IndexModel([('print_issn', ASCENDING)]),
+            IndexModel([('e_issn', ASCENDING)]),
+            IndexModel([('print_isbn', ASCENDING)]),
+            IndexModel([('e_isbn', ASCENDING)]),
+            IndexModel([('title', ASCENDING)]),
+            IndexModel([('conference_name', ASCENDING)])],
+        'arxiv_subjects': [
+            IndexModel([('short', ASCENDING)])],
+        'harvest_state': [
+            IndexModel([('source', ASCENDING), ('keyword', ASCENDING),
+                        ('interval', ASCENDING)], unique=True)],
+        'work_queue': [
+            IndexModel([('step', ASCENDING), ('key', ASCENDING)], unique=True),
+            IndexModel([('step', ASCENDING), ('state', ASCENDING),
+                        ('lease_until', ASCENDING)])],
+        'doi_cache': [
+            IndexModel([('doi', ASCENDING), ('kind', ASCENDING)], unique=True),
+            IndexModel([('expires', ASCENDING)], expireAfterSeconds=0)]
+    }
+    # collections used by the harvesters themselves, they are created
+    # when needed and never restored from the database files
+    INTERNAL_COLLECTIONS = ['harvest_state', 'work_queue', 'doi_cache']
+
 
     @staticmethod
     def _check_db_collection_name(name, mode, data_url=None):
@@ -276,14 +543,110 @@ class Collection():
             except yaml.YAMLError as exc:
                 print(exc)
 
-        if _Database.DATABASE != params['database']['name']:
-            _Database.initialize(params['database']['name'])
+        _Database.initialize(params['database'])
 
-        self.collection_name = Collection._check_db_collection_name(
-            params['database']['collections'][mode],
-            mode,
-            params['database']['data_url']
-        )
+        if mode in Collection.INTERNAL_COLLECTIONS:
+            self.collection_name = params['database']['collections'].get(mode, mode)
+        else:
+            self.collection_name = Collection._check_db_collection_name(
+                params['database']['collections'][mode],
+                mode,
+                params['database']['data_url']
+            )
+        self.mode = mode
+        # the bulk writer of a with-block is only active in its own thread
+        self._local = threading.local()
+        self._create_indexes()
+
+
+    @property
+    def writer(self):
+        '''
+        Returns the active bulk writer of the current thread.
+
+        :returns: Bulk writer or None.
+        :rtype: BulkWriter
+        '''
+        return getattr(self._local, 'writer', None)
+
+
+    @writer.setter
+    def writer(self, writer):
+        self._local.writer = writer
+
+
+    def _create_indexes(self):
+        '''
+        Creates the indexes specified for the intended purpose of the
+        collection. If an index cannot be created, e.g. because an index
+        with the same name and other options exists, a message is printed.
+
+        :returns: None.
+        :rtype: None
+        '''
+
+        if not Collection.INDEXES.get(self.mode):
+            return
+        try:
+            _Database.create_indexes(self.collection_name, Collection.INDEXES[self.mode])
+        except OperationFailure as error:
+            print('Indexes of database table', self.collection_name,
+                  'are not created:', error)
+
+
+    def check_indexes(self):
+        '''
+        Reports the indexes specified for the collection, that are missing
+        in the database table, and the existing indexes, that have not been
+        used since the start of the database server.
+
+        :returns: Names of the missing and the unused indexes.
+        :rtype: dict
+        '''
+
+        existing = _Database.index_information(self.collection_name)
+        missing = [index.document['name']
+                   for index in Collection.INDEXES.get(self.mode, [])
+                   if index.document['name'] not in existing]
+        unused = [stats['name']
+                  for stats in _Database.aggregate(self.collection_name,
+                                                   [{'$indexStats': {}}])
+                  if stats['name'] != '_id_' and not stats['accesses']['ops']]
+        if missing:
+            print('Missing indexes in', self.collection_name, ':', ', '.join(missing))
+        if unused:
+            print('Unused indexes in', self.collection_name, ':', ', '.join(unused))
+        return {'missing': missing, 'unused': unused}
+
+
+    def bulk(self, size=1000):
+        '''
+        Returns a bulk writer for the collection. Within its with-block
+        the write operations of the save methods are buffered and sent
+        as unordered bulk operations.
+
+        :param size: Maximum number of buffered operations.
+        :type size: int
+        :returns: Bulk writer.
+        :rtype: BulkWriter
+        '''
+        return BulkWriter(self, size)
+
+
+    def write(self, operation):
+        '''
+        Buffers the write operation if a bulk writer is active,
+        otherwise the operation is executed immediately.
+
+        :param operation: Write operation.
+        :type operation: pymongo.operations.UpdateOne
+        :returns: None.
+        :rtype: None
+        '''
+        if self.writer:
+            self.writer.add(operation)
+        else:
+            _Database.bulk_write(self.collection_name, [operation])
 
 
     def save(self, query):
@@ -298,6 +661,23 @@ class Collection():
         _Database.insert_one(self.collection_name, query)
 
 
+    def save_once(self, query, data):
+        '''
+        Inserts the passed information, if no entry meets the query,
+        so a repeated harvest does not add duplicates. Within a bulk
+        writer block the upsert is buffered.
+
+        :param query: Characteristics identifying the entry.
+        :type query: dict
+        :param data: Parameter to be inserted.
+        :type data: dict
+        :returns: None.
+        :rtype: None
+        '''
+        data = {field: value for field, value in data.items() if field not in query}
+        self.write(UpdateOne(query, {'$setOnInsert': data}, upsert=True))
+
+
     def get_number_of_entries(self, query):
         '''
         Returns the number of entries from the database table
@@ -311,30 +691,88 @@ class Collection():
         return _Database.count_documents(self.collection_name, query)
 
 
-    def get_entries(self, query):
+    def get_entries(self, query, projection=None, size=50, sort=None, limit=0):
         '''
         Returns the entries from the database table
-        with the specified characteristics.
+        with the specified characteristics. Only the fields
+        of the projection are transferred, e.g. ['lifespan'].
 
         :param query: Characteristics to be met by the entries.
         :type query: dict
+        :param projection: Fields to be returned, all fields if None.
+        :type projection: dict | [str]
+        :param size: Batch size.
+        :type size: int
+        :param sort: Fields and directions to sort the entries by.
+        :type sort: [(str, int)]
+        :param limit: Maximum number of entries, no limit if 0.
+        :type limit: int
         :returns: Entries meeting the characteristics.
         :rtype: pymongo.cursor.Cursor
         '''
-        return _Database.find_with_batch_size(self.collection_name, query, 50)
+        return _Database.find_with_batch_size(self.collection_name, query, size,
+                                              projection, sort, limit)
 
 
-    def get_entry(self, query):
+    def get_values(self, query, field, size=1000):
+        '''
+        Returns the values of one field of the entries from the
+        database table with the specified characteristics, only
+        this field is transferred. Entries without the field
+        return None.
+
+        :param query: Characteristics to be met by the entries.
+        :type query: dict
+        :param field: Field name, e.g. lifespan or language.
+        :type field: str
+        :param size: Batch size.
+        :type size: int
+        :returns: Values of the field.
+        :rtype: generator
+        '''
+        for entry in self.get_entries(query, {field: 1, '_id': 0}, size):
+            yield entry.get(field)
+
+
+    def get_id_ranges(self, number):
+        '''
+        Splits the database table into ranges of document ids with about
+        the same number of entries, e.g. to process them in parallel.
+
+        :param number: Number of ranges.
+        :type number: int
+        :returns: Queries of the id ranges.
+        :rtype: [dict]
+        '''
+
+        buckets = list(_Database.aggregate(
+            self.collection_name,
+            [{'$project': {'_id': 1}},
+             {'$bucketAuto': {'groupBy': '$_id', 'buckets': number}}],
+            allow_disk_use=True))
+        ranges = []
+        for counter, bucket in enumerate(buckets):
+            # the maximum of a bucket is the minimum of the next one,
+            # only the last bucket includes its maximum
+            upper = '$lte' if counter == len(buckets) - 1 else '$lt'
+            ranges.append({'_id': {'$gte': bucket['_id']['min'],
+                                   upper: bucket['_id']['max']}})
+        return ranges
+
+
+    def get_entry(self, query, projection=None):
         '''
         Returns the entry from the database table
         with the specified characteristics.
 
         :param query: Characteristics to be met by the entry.
         :type query: dict
+        :param projection: Fields to be returned, all fields if None.
+        :type projection: dict | [str]
         :returns: Entry meeting the characteristics.
         :rtype: pymongo.cursor.Cursor
         '''
-        return _Database.find_one(self.collection_name, query)
+        return _Database.find_one(self.collection_name, query, projection)
 
 
     def mod_entry(self, ident, query):
@@ -386,6 +824,9 @@ class RepoCollection(Collection):
     the harvested repositories.
     '''
 
+    # fields compared with a research software repository candidate
+    CANDIDATE_FIELDS = ['id', 'full_name', 'language']
+
     def __init__(self):
         '''
         Constructor
@@ -395,12 +836,14 @@ class RepoCollection(Collection):
 
     def save_repo(self, elem, key, source, date):
         '''
-        Adds the harvested repository metadata.
+        Adds the harvested repository metadata. If the repository
+        already exists, only the search terms are added to its keywords.
+        Within a bulk writer block the upsert is buffered.
 
         :param elem: Repository metadata.
         :type elem: dict
-        :param key: Search term found in repository.
-        :type key: str
+        :param key: Search term or terms found in repository.
+        :type key: str | [str]
         :param source: Hosting service of the repository.
         :type source: str
         :param date: Harvesting date.
@@ -408,14 +851,16 @@ class RepoCollection(Collection):
         :returns: None.
         :rtype: None
         '''
-        if self.get_entry({'id': elem['id']}):
-            self.mod_entry({'id': elem['id']},
-                            {'$addToSet': {'keywords': key}})
-        else:
-            elem['source'] = source
-            elem['keywords'] = [key]
-            elem['request_date'] = date
-            self.save(elem)
+        metadata = {field: value for field, value in elem.items()
+                    if field not in ('_id', 'id', 'keywords')}
+        metadata['source'] = source
+        metadata['request_date'] = date
+        keys = key if isinstance(key, list) else [key]
+        self.write(UpdateOne(
+            {'id': elem['id']},
+            {'$setOnInsert': metadata,
+             '$addToSet': {'keywords': {'$each': keys}}},
+            upsert=True))
 
 
 
@@ -428,6 +873,9 @@ class RsRepoCollection(Collection):
     the research software repositories.
     '''
 
+    # fields required by the identification steps
+    STEP_FIELDS = ['id', 'full_name', 'source', 'language']
+
     def __init__(self):
         '''
         Constructor
@@ -439,6 +887,8 @@ class RsRepoCollection(Collection):
         '''
         Depending on an existend entry for a research software repository,
         the information are added to the entry, or a new entry is inserted.
+        Both cases are covered by one upsert, which is buffered within
+        a bulk writer block.
 
         :param id_num: Repository ID.
         :type id_num: int
@@ -457,54 +907,104 @@ class RsRepoCollection(Collection):
         '''
 
         query = {'id': id_num} if id_num else {'full_name': name}
-        if self.get_entry(query):
-            for ident in ids:
-                self.mod_entry(
-                    query,
-                    {'$addToSet': {'references': ident,
-                                   'group': group}})
-        else:
-            self.save(
-                {'id': id_num,
+        entry = {'id': id_num,
                  'full_name': name,
-                 'group': [group],
                  'source': source,
-                 'language': language,
-                 'references': ids})
-
-
-    def merge_duplicates(self, meta_repo, repo):
-        '''
-        Checks if a repository has a duplicate entry.
-
-        :param meta_repo: Repository metadata.
-        :type meta_repo: dict
-        :param repo: Current repository to be checked.
-        :type repo: dict
-        :returns: 0 for no existing duplicates, 1 if exists.
+                 'language': language}
+        for field in query:
+            del entry[field]
+        self.write(UpdateOne(
+            query,
+            {'$setOnInsert': entry,
+             '$addToSet': {'references': {'$each': ids},
+                           'group': group}},
+            upsert=True))
+
+
+    def consolidate_duplicates(self, repositories):
+        '''
+        Merges the repository entries with the same repository id, or
+        without id with the same case insensitive name. The duplicates
+        are found by one aggregation, which also merges their analysis
+        groups, references, and subjects, as well as the progress of the
+        identification steps, and looks up the full name and language of
+        the repository id in the repository collection. The oldest entry
+        of each set of duplicates is kept and extended by the merged
+        information, its full name and language are replaced by the ones
+        of the repository collection, the other entries are removed, all
+        with one bulk operation. Of the commit dates, the ones with the
+        latest last commit are kept.
+
+        :param repositories: Name of the repository collection.
+        :type repositories: str
+        :returns: Number of removed entries.
         :rtype: int
         '''
 
-        duplicate_repo = self.get_entry(
-            {'$and':[{'_id':{'$ne':repo['_id']}},{'id': meta_repo['id']}]})
-        if duplicate_repo:
-            for group in repo['group']:
-                self.mod_entry({'_id':duplicate_repo['_id']}, {'$addToSet':{'group':group}})
-            for ref in repo['references']:
-                self.mod_entry({'_id':duplicate_repo['_id']}, {'$addToSet':{'references':ref}})
-            self.mod_entry(
-                {'_id':duplicate_repo['_id']},
-                {'$set':{'full_name':meta_repo['full_name'], 'language': meta_repo['language']}})
-            self.remove_entry({'_id':repo['_id']})
-            return 1
-        return 0
+        def union(field):
+            return {'$reduce': {'input': field, 'initialValue': [],
+                                'in': {'$setUnion': ['$$value', {'$ifNull': ['$$this', []]}]}}}
+
+        lists = ['group', 'references', 'main_subject', 'subject', 'sub_subject']
+        flags = ['checked_content', 'checked_subject']
+        group = {'_id': {'$ifNull': ['$id', {'$toLower': '$full_name'}]},
+                 'entries': {'$push': '$_id'},
+                 # the commit dates of one entry, the latest last commit first
+                 'commits': {'$max': {'$cond': [
+                     {'$gt': ['$first_commit', None]},
+                     {'last_commit': '$last_commit', 'first_commit': '$first_commit',
+                      'live': '$live', 'lifespan': '$lifespan'},
+                     None]}}}
+        projection = {'entries': 1, 'commits': 1,
+                      'metadata': {'$slice': ['$metadata', 1]}}
+        for field in lists:
+            group[field] = {'$push': '$' + field}
+            projection[field] = union('$' + field)
+        for field in flags:
+            group[field] = {'$max': '$' + field}
+            projection[field] = 1
+
+        removed = 0
+        with self.bulk():
+            for duplicates in _Database.aggregate(
+                    self.collection_name,
+                    [{'$match': {'$or': [{'id': {'$ne': None}},
+                                         {'full_name': {'$type': 'string'}}]}},
+                     {'$sort': {'_id': 1}},
+                     {'$group': group},
+                     {'$match': {'entries.1': {'$exists': True}}},
+                     {'$lookup': {'from': repositories, 'localField': '_id',
+                                  'foreignField': 'id', 'as': 'metadata'}},
+                     {'$project': projection}],
+                    allow_disk_use=True):
+                update = {field: duplicates[field] for field in flags
+                          if duplicates.get(field)}
+                update.update(duplicates.get('commits') or {})
+                if duplicates['metadata']:
+                    update['full_name'] = duplicates['metadata'][0]['full_name']
+                    update['language'] = duplicates['metadata'][0].get('language')
+                operation = {}
+                merged = {field: {'$each': duplicates[field]}
+                          for field in lists if duplicates[field]}
+                if merged:
+                    operation['$addToSet'] = merged
+                if update:
+                    operation['$set'] = update
+                if operation:
+                    self.write(UpdateOne({'_id': duplicates['entries'][0]}, operation))
+                self.write(DeleteMany({'_id': {'$in': duplicates['entries'][1:]}}))
+                removed = removed + len(duplicates['entries']) - 1
+        return removed
 
 
 
     def save_subject(self, name, subject):
         '''
-        The function updates a repository entry with the disciplines,
-        if the fields already exists the values are appended.
+        The function adds the disciplines to a repository entry with one
+        atomic update, the values are appended to the existing ones without
+        duplicates, missing fields are created. The entry is not read
+        before, and an update of a removed entry has no effect. Within a
+        bulk writer block the update is buffered.
 
         :param name: Repository to be updated.
         :type name: str
@@ -514,30 +1014,77 @@ class RsRepoCollection(Collection):
         :rtype: None
         '''
 
-        mode = 'addToSet' if 'main_subject' in self.get_entry({'_id': name}) else 'set'
         genus = subject['subgroups'] if 'subgroups' in subject else [None]
+        self.write(UpdateOne(
+            {'_id': name},
+            {'$addToSet': {'main_subject': {'$each': subject['supergroup']},
+                           'subject': {'$each': subject['groups']},
+                           'sub_subject': {'$each': genus}}}))
 
-        if mode == 'set':
-            self.mod_entry(
-                {'_id':name},
-                {'$set': {'main_subject': subject['supergroup'],
-                          'subject': subject['groups'],
-                          'sub_subject': genus}})
-        elif mode == 'addToSet':
-            for elem in subject['supergroup']:
-                self.mod_entry(
-                    {'_id':name},
-                    {'$addToSet': {'main_subject': elem}})
-            for elem in subject['groups']:
-                self.mod_entry(
-                    {'_id':name},
-                    {'$addToSet': {'subject': elem}})
-            for elem in genus:
-                self.mod_entry(
-                    {'_id':name},
-                    {'$addToSet': {'sub_subject': elem}})
-        else:
-            pass
+
+    def save_subjects(self, subjects, size=1000):
+        '''
+        The function adds the disciplines to many repository entries, the
+        updates are sent as bulk operations of the given size.
+
+        :param subjects: Repository and subject information pairs.
+        :type subjects: iterable
+        :param size: Maximum number of updates per bulk operation.
+        :type size: int
+        :return: Number of updates.
+        :rtype: int
+        '''
+
+        counter = 0
+        with self.bulk(size):
+            for name, subject in subjects:
+                self.save_subject(name, subject)
+                counter = counter + 1
+        return counter
+
+
+    def get_arxiv_subjects(self, query, publications, arxiv_subjects):
+        '''
+        The function joins the repositories meeting the query with the
+        subjects of their referenced publications in one aggregation: the
+        references are unwound, the publications are looked up by DOI or
+        arXiv id, and their primary category in the arXiv subjects. The
+        subjects are grouped per repository in the order of the references.
+
+        :param query: Characteristics to be met by the repositories.
+        :type query: dict
+        :param publications: Publication collection name.
+        :type publications: str
+        :param arxiv_subjects: arXiv subject collection name.
+        :type arxiv_subjects: str
+        :returns: Repository ids with their subjects.
+        :rtype: pymongo.cursor.Cursor
+        '''
+
+        return _Database.aggregate(
+            self.collection_name,
+            [{'$match': query},
+             {'$project': {'references': 1}},
+             {'$unwind': '$references'},
+             # both lookups use the indexes of the publication collection
+             {'$lookup': {'from': publications, 'localField': 'references.id',
+                          'foreignField': 'doi', 'as': 'by_doi'}},
+             {'$lookup': {'from': publications, 'localField': 'references.id',
+                          'foreignField': 'arxiv_id', 'as': 'by_arxiv_id'}},
+             {'$project': {'category': {'$arrayElemAt': [
+                 {'$cond': [{'$eq': ['$references.mode', 'doi']},
+                            '$by_doi.primary_category', '$by_arxiv_id.primary_category']},
+                 0]}}},
+             {'$match': {'category': {'$exists': True}}},
+             {'$lookup': {'from': arxiv_subjects, 'localField': 'category',
+                          'foreignField': 'short', 'as': 'subjects'}},
+             {'$project': {'subject': {'$arrayElemAt': ['$subjects', 0]}}},
+             {'$match': {'subject': {'$exists': True}}},
+             {'$group': {'_id': '$_id',
+                         'subjects': {'$push': {'supergroup': '$subject.supergroup',
+                                                'groups': '$subject.groups',
+                                                'subgroups': '$subject.subgroups'}}}}],
+            allow_disk_use=True)
 
 
     def update_doi(self, repo_id, doi, ident=None):
@@ -689,9 +1236,10 @@ class RsArtifactCollection(Collection):
         '''
         Depending on an existend entry for a publication, the information
         are added to the entry, or a new entry is inserted.
-        Look up the publication id in the database table,
-        if exists, update its repository name list
-        else create a new entry for the publication with its repository.
+        For each publication id an upsert is written, that adds the
+        repository name to the repository list of an existing entry
+        or creates a new entry for the publication with its repository.
+        Within a bulk writer block the upserts are buffered.
 
         :param ids: list of IDs.
         :type ids: [dict]
@@ -702,14 +1250,13 @@ class RsArtifactCollection(Collection):
         '''
 
         for ident in ids:
-            if self.get_entry({'identifier.id': ident['id']}):
-                self.mod_entry(
-                    {'identifier.id': ident['id']},
-                    {'$addToSet': {'repos': repo}})
-            else:
-                self.save(
-                    {'identifier': ident,
-                     'repos': [repo]})
+            update = {'$addToSet': {'repos': repo}}
+            # the id is set by the query itself, if a new entry is inserted
+            identifier = {'identifier.' + field: value
+                          for field, value in ident.items() if field != 'id'}
+            if identifier:
+                update['$setOnInsert'] = identifier
+            self.write(UpdateOne({'identifier.id': ident['id']}, update, upsert=True))
 
 
     def compose_type(self):
@@ -734,3 +1281,534 @@ class RsArtifactCollection(Collection):
                      "$push": {
                          "k": "$_id",
                          "v": "$count" } } } } ])
+
+
+
+class HarvestStateCollection(Collection):
+    '''
+
+    .. class:: HarvestStateCollection
+
+    The HarvestStateCollection class stores the progress of the harvesters,
+    so an interrupted harvest is resumed and a repeated harvest only requests
+    new material. For each source and search term a watermark entry holds
+    the date, until which all search intervals are completed, or the offset
+    of the next publication to be requested. For the search interval in
+    progress an entry holds the URLs of the result pages already stored.
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        super().__init__('harvest_state')
+
+
+    def get_state(self, source, keyword, interval=None):
+        '''
+        Returns the watermark of the search term or, if an interval is
+        given, the progress of the search interval.
+
+        :param source: Harvested source.
+        :type source: str
+        :param keyword: Search term.
+        :type keyword: str
+        :param interval: Search interval.
+        :type interval: str
+        :returns: Harvest state, empty if nothing is harvested yet.
+        :rtype: dict
+        '''
+        return self.get_entry({'source': source, 'keyword': keyword,
+                               'interval': interval}) or {}
+
+
+    def get_open_interval(self, source, keyword):
+        '''
+        Returns the search interval in progress, so an interrupted harvest
+        resumes it with the same boundaries.
+
+        :param source: Harvested source.
+        :type source: str
+        :param keyword: Search term.
+        :type keyword: str
+        :returns: Search interval in progress or None.
+        :rtype: str
+        '''
+        entry = self.get_entry({'source': source, 'keyword': keyword,
+                                'interval': {'$ne': None}})
+        return entry['interval'] if entry else None
+
+
+    def save_page(self, source, keyword, interval, url):
+        '''
+        Adds a stored result page to the progress of the search interval.
+
+        :param source: Harvested source.
+        :type source: str
+        :param keyword: Search term.
+        :type keyword: str
+        :param interval: Search interval.
+        :type interval: str
+        :param url: URL of the stored result page.
+        :type url: str
+        :returns: None.
+        :rtype: None
+        '''
+        self.write(UpdateOne({'source': source, 'keyword': keyword, 'interval': interval},
+                             {'$addToSet': {'pages': url}}, upsert=True))
+
+
+    def complete_interval(self, source, keyword, until):
+        '''
+        Moves the watermark of the search term to the given date, if it is
+        later than the current one, and removes the progress of the search
+        intervals.
+
+        :param source: Harvested source.
+        :type source: str
+        :param keyword: Search term.
+        :type keyword: str
+        :param until: Date until all search intervals are completed.
+        :type until: str
+        :returns: None.
+        :rtype: None
+        '''
+        self.write(UpdateOne({'source': source, 'keyword': keyword, 'interval': None},
+                             {'$max': {'completed_until': until}}, upsert=True))
+        self.remove_entries({'source': source, 'keyword': keyword,
+                             'interval': {'$ne': None}})
+
+
+    def save_offset(self, source, keyword, offset):
+        '''
+        Sets the offset of the next publication to be requested for the
+        search term.
+
+        :param source: Harvested source.
+        :type source: str
+        :param keyword: Search term.
+        :type keyword: str
+        :param offset: Offset of the next publication.
+        :type offset: int
+        :returns: None.
+        :rtype: None
+        '''
+        self.write(UpdateOne({'source': source, 'keyword': keyword, 'interval': None},
+                             {'$set': {'offset': offset}}, upsert=True))
+
+
+
+class LeaseRenewer():
+    '''
+
+    .. class:: LeaseRenewer
+
+    The LeaseRenewer class renews the leases of the items of a processing
+    step claimed by one worker in a background thread, every third of the
+    lease, until its with-block is left. If the worker is interrupted, the
+    renewal stops with it and the leases end as usual.
+
+    :param queue: work queue of the worker.
+    :type queue: WorkQueueCollection
+    :param step: Processing step.
+    :type step: str
+    :param lease: Lease in seconds.
+    :type lease: int
+    '''
+
+    def __init__(self, queue, step, lease):
+        '''
+        Constructor
+        '''
+        self.queue = queue
+        self.step = step
+        self.lease = lease
+        self.stopped = threading.Event()
+        self.thread = None
+
+
+    def __enter__(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+
+    def run(self):
+        '''
+        Renews the leases until the renewer is stopped.
+
+        :returns: None.
+        :rtype: None
+        '''
+        while not self.stopped.wait(self.lease / 3):
+            self.queue.renew(self.step, self.lease)
+
+
+
+class WorkQueueCollection(Collection):
+    '''
+
+    .. class:: WorkQueueCollection
+
+    The WorkQueueCollection class distributes the items of the processing
+    steps, e.g. the repositories of the metadata step, among several worker
+    processes, which may run on different machines. An item is claimed
+    atomically with a lease, that ends after the given number of seconds.
+    If the worker does not complete the item before, e.g. because it was
+    interrupted, the item is claimed again by the next worker. An item is
+    claimed at most MAX_ATTEMPTS times. While a step is processed, the
+    leases of its claimed items are renewed by a LeaseRenewer, so items
+    claimed ahead, e.g. to prefetch them, or waiting for a rate limit do
+    not lose their lease. Completed items are kept, so a step is resumed
+    with the remaining items and items added again are not processed
+    twice. New items, e.g. new documents, are added with their own key,
+    completed items are only processed again after the step is reset.
+
+    :param worker: name of the worker, by default host, process and a random suffix.
+    :type worker: str
+    '''
+
+    # maximum number of claims of an item
+    MAX_ATTEMPTS = 3
+    # default lease in seconds
+    LEASE = 600
+    # default delay in seconds, before a released item is claimed again
+    RETRY_DELAY = 3600
+
+
+    def __init__(self, worker=None):
+        '''
+        Constructor
+        '''
+        super().__init__('work_queue')
+        self.worker = worker or '%s-%i-%s' % (socket.gethostname(), getpid(),
+                                              uuid.uuid4().hex[:6])
+
+
+    def enqueue(self, step, key, payload=None):
+        '''
+        Adds an item to the step, if it is not added yet. Within a
+        bulk writer block the upsert is buffered.
+
+        :param step: Processing step.
+        :type step: str
+        :param key: Key of the item, e.g. the document id.
+        :type key: object
+        :param payload: Additional information of the item.
+        :type payload: dict
+        :returns: None.
+        :rtype: None
+        '''
+        self.write(UpdateOne({'step': step, 'key': key},
+                             {'$setOnInsert': {'state': 'pending', 'attempts': 0,
+                                               'lease_until': None, 'payload': payload}},
+                             upsert=True))
+
+
+    def claim(self, step, lease=None):
+        '''
+        Claims the next pending item of the step, whose retry delay has
+        passed, or an item, whose lease has ended.
+
+        :param step: Processing step.
+        :type step: str
+        :param lease: Lease in seconds.
+        :type lease: int
+        :returns: Claimed item or None, if no item is left.
+        :rtype: dict
+        '''
+
+        now = time.time()
+        return _Database.find_one_and_update(
+            self.collection_name,
+            {'step': step,
+             'attempts': {'$lt': WorkQueueCollection.MAX_ATTEMPTS},
+             '$or': [{'state': 'pending', 'lease_until': None},
+                     {'state': {'$in': ['pending', 'leased']}, 'lease_until': {'$lt': now}}]},
+            {'$set': {'state': 'leased', 'worker': self.worker,
+                      'lease_until': now + (lease or WorkQueueCollection.LEASE)},
+             '$inc': {'attempts': 1}},
+            sort=[('_id', ASCENDING)])
+
+
+    def complete(self, step, key):
+        '''
+        Marks an item claimed by this worker as done. If its lease ended
+        and the item was claimed by another worker in the meantime, it is
+        not marked and the lost lease is reported, as the item may be
+        processed twice.
+
+        :param step: Processing step.
+        :type step: str
+        :param key: Key of the item.
+        :type key: object
+        :returns: True, if the item was marked as done.
+        :rtype: bool
+        '''
+        result = _Database.update_one(
+            self.collection_name,
+            {'step': step, 'key': key, 'worker': self.worker, 'state': 'leased'},
+            {'$set': {'state': 'done', 'lease_until': None}})
+        if not result.matched_count:
+            print('Lease of item', key, 'of step', step, 'lost, it may be processed twice.')
+        return bool(result.matched_count)
+
+
+    def complete_items(self, step, keys):
+        '''
+        Marks several items claimed by this worker as done with one
+        update. Lost leases are reported, see complete.
+
+        :param step: Processing step.
+        :type step: str
+        :param keys: Keys of the items.
+        :type keys: [object]
+        :returns: Number of items marked as done.
+        :rtype: int
+        '''
+        keys = list(keys)
+        if not keys:
+            return 0
+        result = _Database.update_many(
+            self.collection_name,
+            {'step': step, 'key': {'$in': keys}, 'worker': self.worker, 'state': 'leased'},
+            {'$set': {'state': 'done', 'lease_until': None}})
+        if result.matched_count < len(keys):
+            print('Leases of', len(keys) - result.matched_count, 'items of step', step,
+                  'lost, they may be processed twice.')
+        return result.matched_count
+
+
+    def renew(self, step, lease=None):
+        '''
+        Extends the leases of all items of the step claimed by this worker.
+
+        :param step: Processing step.
+        :type step: str
+        :param lease: Lease in seconds from now.
+        :type lease: int
+        :returns: Number of renewed items.
+        :rtype: int
+        '''
+        return _Database.update_many(
+            self.collection_name,
+            {'step': step, 'worker': self.worker, 'state': 'leased'},
+            {'$set': {'lease_until': time.time() + (lease or WorkQueueCollection.LEASE)}}
+        ).modified_count
+
+
+    def renewing(self, step, lease=None):
+        '''
+        Returns a lease renewer for the step. Within its with-block the
+        leases of the items claimed by this worker are renewed regularly.
+
+        :param step: Processing step.
+        :type step: str
+        :param lease: Lease in seconds.
+        :type lease: int
+        :returns: Lease renewer.
+        :rtype: LeaseRenewer
+        '''
+        return LeaseRenewer(self, step, lease or WorkQueueCollection.LEASE)
+
+
+    def release(self, step, key, delay=None):
+        '''
+        Returns an item claimed by this worker to the pending items,
+        so it is retried, if it has attempts left. With a delay the item
+        is not claimed before the delay has passed, e.g. to retry a failed
+        request in a later run instead of using up its attempts at once.
+
+        :param step: Processing step.
+        :type step: str
+        :param key: Key of the item.
+        :type key: object
+        :param delay: Delay in seconds.
+        :type delay: int
+        :returns: None.
+        :rtype: None
+        '''
+        self.mod_entry({'step': step, 'key': key, 'worker': self.worker, 'state': 'leased'},
+                       {'$set': {'state': 'pending',
+                                 'lease_until': time.time() + delay if delay else None}})
+
+
+    def claim_items(self, step, lease=None):
+        '''
+        Claims the items of the step one after another, until no item is
+        left. The caller completes each item after processing it.
+
+        :param step: Processing step.
+        :type step: str
+        :param lease: Lease in seconds.
+        :type lease: int
+        :returns: Claimed items.
+        :rtype: generator
+        '''
+        while True:
+            item = self.claim(step, lease)
+            if not item:
+                return
+            yield item
+
+
+    def claim_entries(self, step, collection, query, projection=None, lease=None):
+        '''
+        Adds the entries of the collection meeting the query to the step
+        and claims them one after another. Entries removed in the meantime,
+        e.g. merged duplicates, or no longer meeting the query are completed
+        without being returned. The
+        caller completes each entry with its document id after processing it.
+
+        :param step: Processing step.
+        :type step: str
+        :param collection: Collection of the entries.
+        :type collection: Collection
+        :param query: Characteristics to be met by the entries.
+        :type query: dict
+        :param projection: Fields of the entries to be returned.
+        :type projection: dict | [str]
+        :param lease: Lease in seconds.
+        :type lease: int
+        :returns: Claimed entries.
+        :rtype: generator
+        '''
+
+        with self.bulk():
+            for entry in collection.get_entries(query, ['_id'], 1000):
+                self.enqueue(step, entry['_id'])
+        for item in self.claim_items(step, lease):
+            entry = collection.get_entry({'$and': [{'_id': item['key']}, query]}, projection)
+            if not entry:
+                self.complete(step, item['key'])
+                continue
+            yield entry
+
+
+    def get_progress(self, step):
+        '''
+        Returns the number of items of the step in each state. Items,
+        that were claimed too often, are counted as failed.
+
+        :param step: Processing step.
+        :type step: str
+        :returns: Number of items per state.
+        :rtype: dict
+        '''
+
+        progress = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for group in _Database.aggregate(
+                self.collection_name,
+                [{'$match': {'step': step}},
+                 {'$group': {'_id': {'state': '$state',
+                                     'failed': {'$gte': ['$attempts',
+                                                         WorkQueueCollection.MAX_ATTEMPTS]}},
+                             'count': {'$sum': 1}}}]):
+            state = group['_id']['state']
+            if state != 'done' and group['_id']['failed']:
+                state = 'failed'
+            progress[state] = progress[state] + group['count']
+        return progress
+
+
+    def reset(self, step):
+        '''
+        Removes all items of the step, so it is processed again.
+
+        :param step: Processing step.
+        :type step: str
+        :returns: None.
+        :rtype: None
+        '''
+        self.remove_entries({'step': step})
+
+
+
+class DoiCacheCollection(Collection):
+    '''
+
+    .. class:: DoiCacheCollection
+
+    The DoiCacheCollection class stores the results of DOI lookups, keyed by
+    the normalised DOI and the kind of lookup: the Crossref status with the
+    metadata (works) and the alias of the DOI handle system (alias). Negative
+    results, e.g. DOIs unknown to Crossref or without alias, are stored as
+    well, so the truncated variants of a DOI are not requested again. The
+    entries expire after the given number of days, negative results earlier
+    than positive ones, and are removed by a TTL index.
+
+    :param positive_days: Days until a positive result expires.
+    :type positive_days: int
+    :param negative_days: Days until a negative result expires.
+    :type negative_days: int
+    '''
+
+    def __init__(self, positive_days=180, negative_days=30):
+        '''
+        Constructor
+        '''
+        super().__init__('doi_cache')
+        self.positive_days = positive_days
+        self.negative_days = negative_days
+
+
+    @staticmethod
+    def normalize(doi):
+        '''
+        Returns the normalised DOI, as DOIs are case insensitive.
+
+        :param doi: DOI name.
+        :type doi: str
+        :returns: Normalised DOI name.
+        :rtype: str
+        '''
+        return doi.strip().lower()
+
+
+    def get_results(self, kind, dois):
+        '''
+        Returns the stored, not expired results of the DOIs.
+
+        :param kind: Kind of lookup, works or alias.
+        :type kind: str
+        :param dois: DOI names.
+        :type dois: [str]
+        :returns: Result with status and value, keyed by the normalised DOI.
+        :rtype: dict
+        '''
+        return {entry['doi']: entry for entry in self.get_entries(
+            {'doi': {'$in': [DoiCacheCollection.normalize(doi) for doi in dois]},
+             'kind': kind,
+             'expires': {'$gt': datetime.utcnow()}},
+            ['doi', 'status', 'value'], 1000)}
+
+
+    def save_result(self, kind, doi, status, value=None):
+        '''
+        Stores the result of a DOI lookup. Results with status 200 and a
+        value are positive, all others negative. Within a bulk writer block
+        the upsert is buffered.
+
+        :param kind: Kind of lookup, works or alias.
+        :type kind: str
+        :param doi: DOI name.
+        :type doi: str
+        :param status: HTTP status of the lookup.
+        :type status: int
+        :param value: Metadata or alias.
+        :type value: object
+        :returns: None.
+        :rtype: None
+        '''
+        days = self.positive_days if status == 200 and value else self.negative_days
+        self.write(UpdateOne({'doi': DoiCacheCollection.normalize(doi), 'kind': kind},
+                             {'$set': {'status': status, 'value': value,
+                                       'expires': datetime.utcnow() + timedelta(days=days)}},
+                             upsert=True))
@@ -0,0 +1,460 @@
+''' This module contains the GitHubGraphQLHarvester class
+    see class doc for more information '''
+
+import json
+from datetime import datetime, timezone
+import requests
+from interfaces.repository_complementer import RepositoryComplementer
+from modules.github_harvester import GitHubHarvester
+from modules.rate_limiter import RateLimiter, RateLimiterPool, get_retry_after
+from modules.http_session import get_session
+
+
+class GitHubGraphQLHarvester(RepositoryComplementer):
+    '''
+
+    .. class:: GitHubGraphQLHarvester
+
+    The GitHubGraphQLHarvester class complements research software repositories
+    by means of the GitHub GraphQL API. Instead of one to three REST calls per
+    repository, the metadata, the root directory entries, and the dates of the
+    first and last commit are requested for a batch of repositories with one
+    query, using one alias per repository. The first commit is requested with
+    a second query, which uses the commit count and a history cursor. The
+    results are kept until the next batch is prefetched, so the metadata,
+    content, and commits steps are served from one request. The metadata are
+    returned in the format of the REST API. The GraphQL API requires an
+    authentication token.
+
+    :param token: authentication token or list of tokens.
+    :type token: str | [str]
+    :param url: GraphQL endpoint, e.g. a local stub server for tests.
+    :type url: str
+    :param batch_size: number of repositories per query.
+    :type batch_size: int
+    :param cache: not used, GraphQL queries are POST requests, which are not
+                  cached, accepted for a uniform harvester constructor.
+    :type cache: HttpCache
+    '''
+
+    # GitHub GraphQL API url
+    GRAPHQL_URL = 'https://api.github.com/graphql'
+    # rate limit in points per window in seconds
+    RATE_LIMIT = (5000, 3600)
+    # status codes of an overloaded service, the query is repeated
+    RETRY_STATUS = [500, 502, 503, 504]
+    # maximum number of attempts of a query
+    MAX_ATTEMPTS = 5
+    # first back off in seconds, if no Retry-After header is given
+    BACKOFF = 1
+    # fields requested for each repository
+    REPOSITORY_FIELDS = '''
+    fragment repositoryFields on Repository {
+      databaseId name nameWithOwner description url
+      createdAt updatedAt pushedAt
+      isFork isArchived isDisabled stargazerCount forkCount
+      owner { login __typename }
+      primaryLanguage { name }
+      licenseInfo { key name spdxId url }
+      object(expression: "HEAD:") { ... on Tree { entries { name } } }
+      defaultBranchRef { target { ... on Commit {
+        oid history(first: 1) { totalCount nodes { author { date } } } } } }
+    }'''
+    # fields requested for the first commit
+    FIRST_COMMIT_FIELDS = '''
+    defaultBranchRef { target { ... on Commit {
+      history(first: 1, after: %s) { nodes { author { date } } } } } }'''
+
+
+    def __init__(self, token, url=None, batch_size=50, cache=None):
+        '''
+        Constructor method
+        '''
+
+        tokens = token if isinstance(token, list) else [token]
+        tokens = [key for key in tokens if key]
+        if not tokens:
+            print('The GitHub GraphQL API requires an authentication token.')
+        self.url = url if url else self.GRAPHQL_URL
+        self.batch_size = batch_size
+        self.rate_limiter = RateLimiterPool({key: RateLimiter(*self.RATE_LIMIT)
+                                             for key in tokens or [None]})
+        # prefetched repositories, keyed by the requested full name
+        self.repositories = {}
+
+
+    def _query(self, query):
+        '''
+        The method sends a GraphQL query, after the rate limiter released
+        it. Errors of single aliases, e.g. for unknown repositories, are
+        ignored, as the alias is returned with null. If a primary or
+        secondary rate limit is hit, also reported by a RATE_LIMITED error,
+        or the service is overloaded (5xx),
+        the query is repeated up to MAX_ATTEMPTS times, after the time
+        given by Retry-After or a back off, which is doubled with every
+        attempt. A rejected query, i.e. errors without data, and a response
+        that is not JSON fail at once.
+
+        :param query: GraphQL query.
+        :type query: str
+        :returns: data of the response or None, if the query failed.
+        :rtype: dict
+        '''
+
+        backoff = self.BACKOFF
+        for _ in range(self.MAX_ATTEMPTS):
+            token = self.rate_limiter.acquire()
+            header = {'Authorization': 'bearer ' + token} if token else {}
+            try:
+                response = get_session().post(self.url, json={'query': query},
+                                              headers=header)
+            except requests.exceptions.RequestException as error:
+                print('Request failed:', error)
+                response = None
+            if response is not None:
+                self.rate_limiter.update(token, response.headers)
+                if (get_retry_after(response.headers) is not None
+                        or response.headers.get('X-RateLimit-Remaining') == '0'):
+                    # the rate limiter holds the query until the next request slot
+                    print('Rate limit exceeded, waiting for the next request slot ...')
+                    continue
+                if (response.status_code not in self.RETRY_STATUS
+                        and not self._is_rate_limited(response)):
+                    return self._get_data(response)
+            self.rate_limiter.limiters[token].block(backoff)
+            backoff *= 2
+        return None
+
+
+    @staticmethod
+    def _is_rate_limited(response):
+        '''
+        The method checks whether a GraphQL response reports a rate limit
+        error, which GitHub may return with status 200.
+
+        :param response: GraphQL response.
+        :type response: requests.models.Response
+        :returns: flag whether the rate limit was hit.
+        :rtype: bool
+        '''
+
+        if response.status_code != 200:
+            return False
+        try:
+            errors = response.json().get('errors') or []
+        except ValueError:
+            return False
+        return any(error.get('type') == 'RATE_LIMITED' for error in errors)
+
+
+    @staticmethod
+    def _get_data(response):
+        '''
+        The method returns the data of a GraphQL response, which is not
+        repeated. Errors of a rejected query are printed.
+
+        :param response: GraphQL response.
+        :type response: requests.models.Response
+        :returns: data of the response or None.
+        :rtype: dict
+        '''
+
+        if response.status_code != 200:
+            print('Query failed with status', response.status_code)
+            return None
+        try:
+            result = response.json()
+        except ValueError:
+            print('Query failed, the response is not JSON.')
+            return None
+        if result.get('data') is None:
+            print('Query rejected:', '; '.join(
+                str(error.get('message')) for error in result.get('errors') or []))
+        return result.get('data')
+
+
+    @staticmethod
+    def _get_alias_query(names, fields):
+        '''
+        The method composes the aliased repository queries for the given
+        repository full names, names without owner are skipped.
+
+        :param names: repository full names.
+        :type names: [str]
+        :param fields: GraphQL selection of each repository.
+        :type fields: [str]
+        :returns: query parts and the aliases with their full names.
+        :rtype: [str], dict
+        '''
+
+        parts = []
+        aliases = {}
+        for counter, (name, selection) in enumerate(zip(names, fields)):
+            if name.count('/') != 1:
+                continue
+            owner, repo = name.split('/')
+            alias = 'r' + str(counter)
+            aliases[alias] = name
+            parts.append('%s: repository(owner: %s, name: %s) { %s }'
+                         % (alias, json.dumps(owner), json.dumps(repo), selection))
+        return parts, aliases
+
+
+    @staticmethod
+    def _to_utc(date):
+        '''
+        The method converts a git timestamp into the UTC format of the
+        REST API, e.g. 2020-10-01T12:00:00Z.
+
+        :param date: git timestamp with time zone offset.
+        :type date: str
+        :returns: UTC timestamp.
+        :rtype: str
+        '''
+
+        if not date:
+            return None
+        timestamp = datetime.strptime(date.replace('Z', '+00:00'), '%Y-%m-%dT%H:%M:%S%z')
+        return timestamp.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+    @staticmethod
+    def _to_metadata(repository):
+        '''
+        The method converts the GraphQL result of a repository into the
+        metadata format of the REST API.
+
+        :param repository: GraphQL repository result.
+        :type repository: dict
+        :returns: repository metadata.
+        :rtype: dict
+        '''
+
+        license_info = repository['licenseInfo']
+        return {
+            'id': repository['databaseId'],
+            'name': repository['name'],
+            'full_name': repository['nameWithOwner'],
+            'owner': {'login': repository['owner']['login'],
+                      'type': repository['owner']['__typename']},
+            'description': repository['description'],
+            'html_url': repository['url'],
+            'fork': repository['isFork'],
+            'archived': repository['isArchived'],
+            'disabled': repository['isDisabled'],
+            'created_at': repository['createdAt'],
+            'updated_at': repository['updatedAt'],
+            'pushed_at': repository['pushedAt'],
+            'stargazers_count': repository['stargazerCount'],
+            'watchers_count': repository['stargazerCount'],
+            'forks_count': repository['forkCount'],
+            'forks': repository['forkCount'],
+            'language': (repository['primaryLanguage']['name']
+                         if repository['primaryLanguage'] else None),
+            'license': ({'key': license_info['key'],
+                         'name': license_info['name'],
+                         'spdx_id': license_info['spdxId'],
+                         'url': license_info['url']} if license_info else None)
+        }
+
+
+    def prefetch(self, names):
+        '''
+        The method requests the metadata, the root directory entries, and
+        the commit dates of the given repositories in batches and keeps them
+        for the following calls. Repositories, that do not exist, are kept
+        as None. The results of a preceding prefetch are discarded.
+
+        :param names: repository full names.
+        :type names: [str]
+        :returns: None
+        :rtype: None
+        '''
+
+        self.repositories = {}
+        self._fetch(names)
+
+
+    def _fetch(self, names):
+        '''
+        The method requests the metadata, the root directory entries, and
+        the commit dates of the given repositories in batches and adds them
+        to the kept repositories. If a query fails, the repositories of its
+        batch are not kept, so they are requested again on the next call.
+
+        :param names: repository full names.
+        :type names: [str]
+        :returns: None
+        :rtype: None
+        '''
+
+        names = list(dict.fromkeys(names))
+        for start in range(0, len(names), self.batch_size):
+            batch = names[start:start + self.batch_size]
+            parts, aliases = self._get_alias_query(
+                batch, ['...repositoryFields'] * len(batch))
+            data = self._query('query { %s }\n%s' % (' '.join(parts), self.REPOSITORY_FIELDS)
+                               ) if parts else {}
+            if data is None:
+                continue
+            self.repositories.update({name: None for name in batch})
+
+            first_commits = {}
+            for alias, name in aliases.items():
+                repository = data.get(alias)
+                if not repository:
+                    continue
+                entry = {'metadata': self._to_metadata(repository),
+                         'entries': None, 'commits': 0,
+                         'first_commit': None, 'last_commit': None}
+                if repository['object']:
+                    entry['entries'] = [elem['name'] for elem in repository['object']['entries']]
+                target = (repository['defaultBranchRef'] or {}).get('target') or {}
+                if target.get('history'):
+                    entry['commits'] = target['history']['totalCount']
+                    if target['history']['nodes']:
+                        entry['last_commit'] = self._to_utc(
+                            target['history']['nodes'][0]['author']['date'])
+                    if entry['commits'] == 1:
+                        entry['first_commit'] = entry['last_commit']
+                    elif entry['commits'] > 1:
+                        # the history cursor consists of the head commit and an offset
+                        first_commits[name] = json.dumps(
+                            target['oid'] + ' ' + str(entry['commits'] - 2))
+                self.repositories[name] = entry
+
+            if first_commits:
+                self._prefetch_first_commits(first_commits)
+
+
+    def _prefetch_first_commits(self, cursors):
+        '''
+        The method requests the first commit of the given repositories
+        with one query, starting the history after the given cursors.
+
+        :param cursors: history cursor for each repository full name.
+        :type cursors: dict
+        :returns: None
+        :rtype: None
+        '''
+
+        names = list(cursors)
+        parts, aliases = self._get_alias_query(
+            names, [self.FIRST_COMMIT_FIELDS % cursors[name] for name in names])
+        data = self._query('query { %s }' % ' '.join(parts))
+        if not data:
+            return
+        for alias, name in aliases.items():
+            try:
+                nodes = data[alias]['defaultBranchRef']['target']['history']['nodes']
+                self.repositories[name]['first_commit'] = self._to_utc(nodes[0]['author']['date'])
+            except (KeyError, IndexError, TypeError):
+                continue
+
+
+    def _get_repository(self, name):
+        '''
+        The method returns the prefetched information of a repository,
+        if it was not prefetched, it is requested and added to the
+        prefetched repositories.
+
+        :param name: repository full name.
+        :type name: str
+        :returns: repository information or None.
+        :rtype: dict
+        '''
+
+        if name not in self.repositories:
+            self._fetch([name])
+        return self.repositories.get(name)
+
+
+    def get_api_response(self, api_cat, name, num_requests, url=None):
+        '''
+        The method returns the metadata ('metadata') or the root directory
+        entries ('content') of a repository in the JSON format of the REST
+        API as response. For unknown repositories or other API categories
+        None is returned.
+
+        :param api_cat: API call categorie, metadata or content.
+        :type api_cat: str
+        :param name: Repository name.
+        :type name: str
+        :param num_requests: Remaining requests, not used.
+        :type num_requests: int
+        :param url: Next API call, not used.
+        :type url: str
+        :returns: HTTPs response or None, remaining rate limit.
+        :rtype: requests.models.Response, int
+        '''
+
+        if api_cat not in ['metadata', 'content']:
+            return None, self.rate_limiter.get_remaining()
+        repository = self._get_repository(name)
+        if not repository or (api_cat == 'content' and repository['entries'] is None):
+            return None, self.rate_limiter.get_remaining()
+
+        response = requests.models.Response()
+        response.status_code = 200
+        response.encoding = 'utf-8'
+        if api_cat == 'metadata':
+            content = repository['metadata']
+        else:
+            content = [{'name': entry} for entry in repository['entries']]
+        response._content = json.dumps(content).encode('utf-8')
+        return response, self.rate_limiter.get_remaining()
+
+
+    def has_no_possible_source_code_files(self, name, num_requests):
+        '''
+        The method checks whether a repository may be a source code repository.
+        If it only contains a Readme file, a License file, and a .gitignore
+        file, it is assumed that the respoitory is not a source code repository
+        and True is returned, as well as the number of remaining requests.
+
+        :param name: Repository name.
+        :type name: str
+        :param num_requests: Remaining requests, not used.
+        :type num_requests: int
+        :returns: flag indicating if repository may be a source code
+                  repository, number of remaining requests
+        :rtype: bool, int
+        '''
+
+        repository = self._get_repository(name)
+        limit = self.rate_limiter.get_remaining()
+        if not repository or not repository['entries']:
+            return True, limit
+
+        entries = repository['entries']
+        if len(GitHubHarvester.NON_SOURCE_CODE_FILES_IDENTIFIER) >= len(entries):
+            non_source_code_files = [
+                entry for entry in entries
+                if any(identifier in entry.lower()
+                       for identifier in GitHubHarvester.NON_SOURCE_CODE_FILES_IDENTIFIER)]
+            return len(non_source_code_files) == len(entries), limit
+        return False, limit
+
+
+    def get_first_commit(self, name, num_requests):
+        '''
+        The method returns the dates of the first and last commit of the
+        default branch. Returned are the flag of a failed request, the date
+        of the first and last commit, as well as the number of remaining
+        requests.
+
+        :param name: Repository name.
+        :type name: str
+        :param num_requests: Remaining requests, not used.
+        :type num_requests: int
+        :returns: Failed request flag, first commit date, last commit date,
+                  remaining rate limit
+        :rtype: bool, str, str, int
+        '''
+
+        repository = self._get_repository(name)
+        limit = self.rate_limiter.get_remaining()
+        if (not repository or not repository['first_commit']
+                or not repository['last_commit']):
+            return True, None, None, limit
+        return False, repository['first_commit'], repository['last_commit'], limit
@@ -1,12 +1,18 @@
 ''' This module contains the GitHubHarvester class
     see class doc for more information '''
 
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import requests
 from dateutil.relativedelta import relativedelta
+import requests
+from requests.utils import parse_header_links
 from interfaces.repository_harvester import RepositoryHarvester
 from interfaces.repository_complementer import RepositoryComplementer
+from modules.rate_limiter import RateLimiter, RateLimiterPool
+from modules.http_cache import HttpCache
+from modules.http_session import get_session
 
 class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
     '''
@@ -16,9 +22,18 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
     The GitHubHarvester class contains all mandatory methods to gather research
     software candidates, their Readme files and metadata. It may also be used
     for harvesting all repositories containing specific search terms.
-
-    :param token: specifies the required rate_limit, search or core limit.
-    :type token: str
+    All requests are paced by rate limiters, one for the search and one for
+    the core limit, which are shared by all instances using the same token.
+    If several tokens are given, each request is sent with the token that
+    has budget left, so the rate limits of all tokens add up.
+
+    Core requests may be answered from a HTTP cache, they are sent as
+    conditional requests and a 304 response is served from the cache.
+
+    :param token: authentication token or list of tokens.
+    :type token: str | [str]
+    :param cache: HTTP cache or path of its SQLite file.
+    :type cache: HttpCache | str
     '''
     # URL to request the remaining rate limit
     RATE_REQUEST = 'https://api.github.com/rate_limit'
@@ -30,10 +45,23 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
     SUFFIX = '&per_page=100'
     # additional element to set the search interval in the query
     INFIX = '+created:'
+    # maximum number of results returned for a search query
+    MAX_SEARCH_RESULTS = 1000
+    # repository fields searched, if a search term has no in: qualifier
+    DEFAULT_SEARCH_FIELDS = ['name', 'description', 'topics']
     # list of file identifier in a repository that are no source code file. If a
     # repository contains only these file, it's not classified as research
     # software
     NON_SOURCE_CODE_FILES_IDENTIFIER = ['readme', 'license', 'gitignore']
+    # rate limits per window in seconds, with and without authentication token
+    RATE_LIMITS = {
+        'core': {True: (5000, 3600), False: (60, 3600)},
+        'search': {True: (30, 60), False: (10, 60)}
+    }
+    # maximum number of attempts for a request hitting a rate limit
+    MAX_ATTEMPTS = 5
+    # rate limiters for each token, shared by all instances
+    _RATE_LIMITERS = {}
 
 
     def _is_valid_api_token(self, token=None):
@@ -46,7 +74,7 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         :rtype: bool
         '''
         if token:
-            response = requests.get(
+            response = get_session().get(
                 self.RATE_REQUEST,
                 headers={
                     'Authorization': 'token ' + token
@@ -58,109 +86,138 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         return False
 
 
-    def __init__(self, token=None):
+    def __init__(self, token=None, cache=None):
         '''
         Constructor method
         '''
 
         # optional header for API request, but recommended by GitHub, sets the
-        # response format to json and, if available, contains the
-        # authentication token
+        # response format to json, the authentication token is added for
+        # each request
         self.header_request = {
             'Accept': 'application/vnd.github.v3+json'
         }
         # optional header for API request regarding Readme files, sets the
-        # response format to raw and, if available, contains the
-        # authentication token
+        # response format to raw, the authentication token is added for
+        # each request
         self.header_readme = {
             'Accept': 'application/vnd.github.v3.raw'
         }
-        if self._is_valid_api_token(token):
-            self.header_request['Authorization'] = 'token ' + token
-            self.header_readme['Authorization'] = 'token ' + token
-            # Seconds to sleep between two search API calls
-            self.sleep_search = 2
-            # Seconds to sleep after a core API call, including requests for
-            # commits, content, and Readme files
-            self.sleep_core = 0.6
-        else:
-            # Seconds to sleep between two search API calls
-            self.sleep_search = 6
-            # Seconds to sleep after a core API call, including requests for
-            # commits, content, and Readme files
-            self.sleep_core = 60
-            #print('No auth token defined, search requests are limited to 10',
-            #      'per minute, other requests are limited to 60 per hour.')
+        tokens = token if isinstance(token, list) else [token]
+        tokens = [key for key in tokens if self._is_valid_api_token(key)]
+        #if not tokens:
+        #    print('No auth token defined, search requests are limited to 10',
+        #          'per minute, other requests are limited to 60 per hour.')
+
+        for key in tokens or [None]:
+            if key not in GitHubHarvester._RATE_LIMITERS:
+                GitHubHarvester._RATE_LIMITERS[key] = {
+                    mode: RateLimiter(*limits[bool(key)])
+                    for mode, limits in self.RATE_LIMITS.items()}
+        self.rate_limiters = {
+            mode: RateLimiterPool({key: GitHubHarvester._RATE_LIMITERS[key][mode]
+                                   for key in tokens or [None]})
+            for mode in self.RATE_LIMITS}
+        self.cache = HttpCache(cache) if isinstance(cache, str) else cache
 
 
     def get_search_sleep_time(self):
         '''
-        The method returns the adapted sleep times for the GitHub REST API
-        to generate a constant load. The rate limits are set as follows:
-        search limit with token: 30 requests per minute
-        search limit without token: 10 requests per minute
-
-        Resulting in the following sleep times between two API calls:
-        search with token: 2 seconds
-        search without token: 7 seconds
+        The method returns the sleep time between two search API calls.
+        The search requests are paced by the rate limiter of the harvester,
+        which spreads the remaining requests over the current rate limit
+        window, so no additional sleep time is required.
 
         :returns: Sleep time in seconds.
         :rtype: float
         '''
-        return self.sleep_search
+        return 0
 
 
     def get_core_sleep_time(self):
         '''
-        The method returns the adapted sleep times for the GitHub REST API
-        to generate a constant load. The rate limits are set as follows:
-        core limit with token: 5000 requests per hour
-        core limit wthout token: 60 requests per hour
-
-        Resulting in the following sleep times between two API calls:
-        core with token: 0.6 seconds
-        core without token: 65 seconds
+        The method returns the sleep time after a core API call.
+        The core requests, including requests for commits, content, and
+        Readme files, are paced by the rate limiter of the harvester,
+        which spreads the remaining requests over the current rate limit
+        window, so no additional sleep time is required.
 
         :returns: Sleep time in seconds.
         :rtype: float
         '''
-        return self.sleep_core
+        return 0
 
 
-    def __check_rate_limit(self, header, mode, remaining_requests):
+    def _request(self, url, mode, header):
         '''
-        The method returns the API rate limit for either
-        the search requests or the core requests. If the rate limit
-        limit is exhausted, the process sleeps for the time in seconds
-        computed via the returned utc epoche seconds.
-
-        :param header: header in json format for GitHub API calls.
-        :type header: json object
-        :param mode: specifies the required rate_limit, search or core limit.
+        The method sends a GET request with the token, whose rate limiter
+        of the given mode releases it first, and updates this rate limiter
+        with the response headers. If a primary or secondary rate limit is
+        hit, the request is repeated once a limiter allows it again.
+        If a HTTP cache is available, core requests are sent as conditional
+        requests and on a 304 response the cached response is returned.
+
+        :param url: URL to request.
+        :type url: str
+        :param mode: rate limit of the request, search or core.
         :type mode: str
-        :param remaining_requests: number of remaining requests from
-                                   previousAPI response.
-        :type remaining_requests: int.
-        :returns: None
-        :rtype: None
-        :raises: AttributeError, KeyError
+        :param header: request header without authentication.
+        :type header: dict
+        :returns: response of the last attempt.
+        :rtype: requests.models.Response
+        '''
+
+        pool = self.rate_limiters[mode]
+        cache = self.cache if mode == 'core' else None
+        entry = cache.lookup(url, header['Accept']) if cache else None
+        for _ in range(self.MAX_ATTEMPTS):
+            token = pool.acquire()
+            request_header = dict(header, **HttpCache.get_validators(entry))
+            if token:
+                request_header['Authorization'] = 'token ' + token
+            response = get_session().get(url, headers=request_header)
+            pool.update(token, response.headers)
+            if (response.status_code not in [403, 429]
+                or not ('Retry-After' in response.headers
+                        or response.headers.get('X-RateLimit-Remaining') == '0')):
+                break
+            print('Rate limit exceeded, waiting for the next request slot ...')
+
+        if cache and entry and response.status_code == 304:
+            return cache.get_response(entry, response)
+        if cache:
+            cache.store(url, header['Accept'], response)
+        return response
+
+
+    @staticmethod
+    def _get_start_date(start, completed_until=None):
         '''
+        The method returns the start date of the search period, which is
+        the day after the watermark, if the search period is harvested up
+        to a later date.
 
-        if remaining_requests in (-1, 0):
-            response = requests.get(self.RATE_REQUEST, headers=header)
-            utc = response.json()['resources'][mode]['reset']
-            seconds = (utc - int(time.time())) + 2
+        :param start: start date of the search period.
+        :type start: str
+        :param completed_until: date until all intervals are harvested.
+        :type completed_until: str
+        :returns: start date.
+        :rtype: datetime.datetime
+        '''
 
-            if response.json()['resources'][mode]['remaining'] == 0:
-                print("waiting for rate limit reset in: ", seconds)
-                time.sleep(seconds)
+        start_date = datetime.strptime(start, '%Y-%m-%d')
+        if completed_until:
+            start_date = max(start_date, datetime.strptime(completed_until, '%Y-%m-%d')
+                             + relativedelta(days=1))
+        return start_date
 
 
-    def create_interval(self, start, end, delta):
+    def create_interval(self, start, end, delta, completed_until=None):
         '''
         The generator method creates search intervals
         for the given period, the latest end date for the intervals is
-        today and the generator stops.
+        today and the generator stops. If a watermark is given, the
+        period starts the day after it.
 
         :param start: start date of the search period.
         :type start: str
@@ -168,12 +225,15 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         :type end: str
         :param delta: size of the search intervals.
         :type delta: str
+        :param completed_until: date until all intervals are harvested.
+        :type completed_until: str
         :returns: time interval.
         :rtype: str
         :raises: ValueError.
         '''
 
-        start_date = datetime.strptime(start, '%Y-%m-%d')
+        start_date = self._get_start_date(start, completed_until)
+        start = datetime.strftime(start_date, '%Y-%m-%d')
         fstr = 'relativedelta('+delta+')'
         now = datetime.now()
         if datetime.strptime(end, '%Y-%m-%d') < now:
@@ -217,6 +277,85 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
             start_date = interval_end
 
 
+    def search_intervals(self, key, start, end, delta, completed_until=None, resume=None):
+        '''
+        The generator method adapts the search intervals to the number of
+        results. Starting with the given size, the first result page of each
+        interval is requested. If its total count exceeds the limit of 1000
+        results, the interval is halved and requested again, down to a
+        single day. If the total count is below a quarter of the limit, the
+        following interval is doubled, so sparse periods are merged. If the
+        first page could not be requested, the interval is returned without
+        response and the following interval keeps its size. An interrupted
+        interval, given to resume, is requested again with its boundaries,
+        so the result pages stored for it are recognised. The
+        latest end date is today. If a watermark is given, the period starts
+        the day after it.
+
+        :param key: search term.
+        :type key: str
+        :param start: start date of the search period.
+        :type start: str
+        :param end: end date of the search period.
+        :type end: str
+        :param delta: initial size of the search intervals.
+        :type delta: str
+        :param completed_until: date until all intervals are harvested.
+        :type completed_until: str
+        :param resume: interval in progress, that starts after the watermark.
+        :type resume: str
+        :returns: search interval and the response of its first page or None.
+        :rtype: (str, requests.models.Response)
+        '''
+
+        start_date = self._get_start_date(start, completed_until)
+        end_of_period = min(datetime.strptime(end, '%Y-%m-%d'), datetime.now())
+        if start_date > end_of_period:
+            print('The search period ends before it starts.')
+            return
+        days = (start_date + eval('relativedelta('+delta+')') - start_date).days
+        if days < 1:
+            print('The time delta has to be a positive integer greater 0')
+            return
+
+        # the interrupted interval is kept as it is, even if it is not split
+        # according to the current number of results
+        resumed = False
+        if resume:
+            bounds = [datetime.strptime(date, '%Y-%m-%d') for date in resume.split('..')]
+            if bounds[0] == start_date:
+                days = (bounds[-1] - start_date).days + 1
+                resumed = True
+
+        while start_date <= end_of_period:
+            end_date = min(start_date + relativedelta(days=days-1), end_of_period)
+            interval = datetime.strftime(start_date, '%Y-%m-%d')
+            if end_date > start_date:
+                interval = interval + '..' + datetime.strftime(end_date, '%Y-%m-%d')
+            response = self.get_search_results(-1, None, key, interval)
+            kept, resumed = resumed, False
+
+            # a failed first page tells nothing about the number of results,
+            # the interval is returned and the size of the next one is kept
+            if not response:
+                yield interval, None
+                start_date = end_date + relativedelta(days=1)
+                continue
+
+            total = response.json().get('total_count', 0)
+            if total > self.MAX_SEARCH_RESULTS and end_date > start_date and not kept:
+                days = max((end_date - start_date).days // 2, 1)
+                continue
+            if total > self.MAX_SEARCH_RESULTS:
+                print('The interval', interval, 'exceeds the limit of',
+                      self.MAX_SEARCH_RESULTS, 'results with', total, 'results.')
+            yield interval, response
+
+            if total < self.MAX_SEARCH_RESULTS // 4:
+                days = days * 2
+            start_date = end_date + relativedelta(days=1)
+
+
     def get_next_page(self, pages):
         '''
         The method extracts the url of the next page
@@ -227,24 +366,211 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         :type pages: [str]
         :returns: url of the next result page or None.
         :rtype: str
-        :raises: ValueError.
         '''
 
-        counter = 0
-        # identifying next url
-        while counter < len(pages):
-            if (pages[counter].split(";")[1][6:10] == "next") and (counter == 0):
-                # truncate url by "<" (first position)
-                # and ">" (last position)
-                return pages[counter].split(";")[0][1:-1]
-            if (pages[counter].split(";")[1][6:10]) == "next":
-                # truncate url by "blank <" (at the beginning)
-                # and ">" (at the end)
-                return pages[counter].split(";")[0][2:-1]
-            if counter == (len(pages)-1):
-                # no available next url
-                return None
-            counter = counter + 1
+        for link in parse_header_links(','.join(pages)):
+            if link.get('rel') == 'next':
+                return link['url']
+        return None
+
+
+    def get_search_pages(self, response, workers=4, skip=()):
+        '''
+        The generator method returns the result pages of a search query,
+        starting with the given first page. The URLs of the following pages
+        are derived from the link to the last page, these pages are requested
+        concurrently within the search rate limit and returned as they
+        arrive, so they may be stored while the next ones are requested.
+        Pages already stored are skipped. A page, whose request failed, is
+        returned as None with its URL, or without URL if the first page
+        failed, so the caller may request it again.
+
+        :param response: first result page or None.
+        :type response: requests.models.Response
+        :param workers: number of concurrent requests.
+        :type workers: int
+        :param skip: URLs of the pages already stored.
+        :type skip: [str]
+        :returns: URL and result page or None, in the order of their arrival.
+        :rtype: (str, requests.models.Response)
+        '''
+
+        if not response:
+            yield None, None
+            return
+        if response.url not in skip:
+            yield response.url, response
+
+        last = response.links.get('last', {}).get('url')
+        if not last:
+            return
+        number = re.search(r'[?&]page=(\d+)', last)
+        if not number:
+            return
+        urls = [re.sub(r'([?&])page=\d+', r'\g<1>page=' + str(page), last)
+                for page in range(2, int(number.group(1)) + 1)]
+        urls = [url for url in urls if url not in skip]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.get_search_results, -1, url, None, None): url
+                       for url in urls}
+            for future in as_completed(futures):
+                try:
+                    page = future.result()
+                except requests.exceptions.RequestException as error:
+                    print('Request failed:', error)
+                    page = None
+                yield futures[future], page or None
+
+
+    @staticmethod
+    def _parse_keyword(key):
+        '''
+        The method splits a search term into its terms, its qualifiers, and
+        the searched fields of its in: qualifier, e.g. doi+10+in:readme into
+        ('doi', '10'), (), ('readme',).
+
+        :param key: search term.
+        :type key: str
+        :returns: terms, qualifiers without in:, searched fields or None.
+        :rtype: (str), (str), (str)
+        '''
+
+        terms = []
+        qualifiers = []
+        fields = None
+        for part in key.split('+'):
+            if part.startswith('in:'):
+                fields = tuple(part[3:].split(','))
+            elif ':' in part:
+                qualifiers.append(part)
+            elif part:
+                terms.append(part)
+        return tuple(terms), tuple(qualifiers), fields
+
+
+    def plan_queries(self, keywords):
+        '''
+        The method merges the search terms, which only differ in their in:
+        qualifier, into one search query over the union of their searched
+        fields, e.g. doi+10 and doi+10+in:readme into
+        doi+10+in:name,description,topics,readme. As GitHub combines the
+        fields of an in: qualifier with OR, the merged query returns the
+        results of all merged search terms with one request per page.
+
+        :param keywords: search terms.
+        :type keywords: [str]
+        :returns: search queries with the search terms they cover.
+        :rtype: [(str, [str])]
+        '''
+
+        groups = {}
+        for key in keywords:
+            terms, qualifiers, _ = self._parse_keyword(key)
+            groups.setdefault((terms, qualifiers), []).append(key)
+
+        queries = []
+        for (terms, qualifiers), keys in groups.items():
+            if len(keys) == 1:
+                queries.append((keys[0], keys))
+                continue
+            fields = []
+            for key in keys:
+                for field in self._parse_keyword(key)[2] or self.DEFAULT_SEARCH_FIELDS:
+                    if field not in fields:
+                        fields.append(field)
+            queries.append(('+'.join(terms + qualifiers + ('in:' + ','.join(fields),)), keys))
+        return queries
+
+
+    @staticmethod
+    def _contains_terms(terms, text):
+        '''
+        The method checks whether a text contains all terms as whole words,
+        as GitHub splits the searched fields at non alphanumeric characters,
+        e.g. doi and 10 are contained in doi:10.5281, but not in Doing 2010.
+
+        :param terms: search terms.
+        :type terms: (str)
+        :param text: searched text.
+        :type text: str
+        :returns: flag whether all terms are contained.
+        :rtype: bool
+        '''
+
+        return all(re.search(r'(?<![^\W_])' + re.escape(term.strip('"')) + r'(?![^\W_])',
+                             text, re.IGNORECASE)
+                   for term in terms)
+
+
+    def match_keywords(self, item, keywords, readme=None):
+        '''
+        The method returns the search terms of a merged search query, that
+        a search result matches. A search term matches, if all its terms
+        are contained as whole words in one of its searched fields. Fields
+        not contained in the search result, e.g. the Readme file, are only
+        checked if given. If no search term matches, the result was found in
+        such a field, so the search terms searching these fields are
+        returned. The search terms searching the Readme file are added by
+        match_readme_keywords, once the Readme file is harvested.
+
+        :param item: search result.
+        :type item: dict
+        :param keywords: search terms of the search query.
+        :type keywords: [str]
+        :param readme: Readme file of the repository, if available.
+        :type readme: str
+        :returns: matching search terms.
+        :rtype: [str]
+        '''
+
+        if len(keywords) == 1:
+            return list(keywords)
+        texts = {'name': item.get('name') or '',
+                 'description': item.get('description') or '',
+                 'topics': ' '.join(item.get('topics') or []),
+                 'readme': readme}
+        matches = []
+        unchecked = []
+        for key in keywords:
+            terms, _, fields = self._parse_keyword(key)
+            fields = fields or self.DEFAULT_SEARCH_FIELDS
+            if any(texts.get(field) and self._contains_terms(terms, texts[field])
+                   for field in fields):
+                matches.append(key)
+            elif any(texts.get(field) is None for field in fields):
+                unchecked.append(key)
+        return matches or unchecked or list(keywords)
+
+
+    def match_readme_keywords(self, keywords, attributed, readme):
+        '''
+        The method returns the search terms searching the Readme file, which
+        the harvested Readme file of a repository matches. Only search terms
+        merged into one search query with a search term already attributed
+        to the repository are returned, as only the results of this query
+        would have been returned by a separate search.
+
+        :param keywords: configured search terms.
+        :type keywords: [str]
+        :param attributed: search terms attributed to the repository.
+        :type attributed: [str]
+        :param readme: Readme file of the repository.
+        :type readme: str
+        :returns: matching search terms, that are not attributed yet.
+        :rtype: [str]
+        '''
+
+        matches = []
+        for _, keys in self.plan_queries(keywords):
+            if len(keys) == 1 or not set(keys) & set(attributed or []):
+                continue
+            for key in keys:
+                terms, _, fields = self._parse_keyword(key)
+                if (key not in (attributed or []) and fields and 'readme' in fields
+                        and self._contains_terms(terms, readme)):
+                    matches.append(key)
+        return matches
 
 
     def get_search_results(self, remaining_requests, next_url, key, interval):
@@ -274,13 +600,11 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
             url = self.BASE_URL + self.SEARCH_INFIX + \
                 key + self.INFIX + interval + self.SUFFIX
 
-        self.__check_rate_limit(self.header_request,
-                              'search', remaining_requests)
-        response = requests.get(url, headers=self.header_request)
+        response = self._request(url, 'search', self.header_request)
 
         if response.status_code in [301, 302, 307]:
             next_url = response.headers['Location']
-            response = requests.get(next_url, headers=self.header_request)
+            response = self._request(next_url, 'search', self.header_request)
         elif response.status_code != 200:
             return None
         return response
@@ -335,26 +659,53 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         :rtype: requests.models.Response
         '''
 
-        self.__check_rate_limit(self.header_request, 'core', num_requests)
-        header = self.header_readme if api_cat == 'readme' else self.header_request
-        api_url = url if url else self.__get_api_response_url(api_cat, name)
+        response = self.request_api(api_cat, name, url)
+        if response is None:
+            return None, num_requests
+        if response.status_code != 200:
+            return None, self.rate_limiters['core'].get_remaining()
+        return response, self.rate_limiters['core'].get_remaining()
 
-        if api_url:
-            response = requests.get(api_url, headers=header)
 
-            if response.status_code in [301, 302, 307]:
-                next_url = response.headers['Location']
-                self.__check_rate_limit(self.header_request, 'core', int(
-                    response.headers['X-Ratelimit-Remaining']))
-                response = requests.get(next_url, headers=header)
-                return response, int(response.headers['X-Ratelimit-Remaining'])
+    def request_api(self, api_cat, name, url=None):
+        '''
+        The method requests information from the GitHub REST API, if a
+        redirect occurs, the link is followed. The response is returned
+        with any status code, so the caller may tell a missing resource
+        (404) from a failed request, e.g. after the rate limit retries.
+
+        :param api_cat: API call categorie, including commits, content
+                        and Readme files.
+        :type api_cat: str
+        :param name: User or repository name.
+        :type name: str
+        :param url: Next API call, if available.
+        :type url: str
+        :returns: HTTPs response or None for an unknown API call categorie.
+        :rtype: requests.models.Response
+        '''
+
+        header = self.header_readme if api_cat == 'readme' else self.header_request
+        api_url = url if url else self.__get_api_response_url(api_cat, name)
+        if not api_url:
+            return None
+        response = self._request(api_url, 'core', header)
+        if response.status_code in [301, 302, 307]:
+            response = self._request(response.headers['Location'], 'core', header)
+        return response
 
-            if response.headers['status'] != '200 OK':
-                return None, int(response.headers['X-Ratelimit-Remaining'])
 
-            return response, int(response.headers['X-Ratelimit-Remaining'])
+    def get_readme_response(self, name):
+        '''
+        The method requests the Readme file of a repository and returns
+        the response with any status code, see request_api.
 
-        return None, num_requests
+        :param name: Repository id or full name.
+        :type name: str
+        :returns: HTTPs response.
+        :rtype: requests.models.Response
+        '''
+        return self.request_api('readme', name)
 
 
     def has_no_possible_source_code_files(self, name, num_requests):
@@ -375,7 +726,6 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         :rtype: bool, int
         '''
 
-        self.__check_rate_limit(self.header_request, 'core', num_requests)
         content, limit = self.get_api_response('content', name, num_requests)
         non_source_code_file_list = []
 
@@ -409,7 +759,6 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
         :rtype: bool, str, str, in
         '''
 
-        self.__check_rate_limit(self.header_request, 'core', num_requests)
         response, limit = self.get_api_response('commit', name, num_requests)
         valid_json_list = True
         retries = 0
@@ -420,11 +769,10 @@ class GitHubHarvester(RepositoryHarvester, RepositoryComplementer):
             return True, None, None, limit
 
         if response.headers['link']:
-            self.__check_rate_limit(self.header_request, 'core', limit)
             while retries < 6:
-                first_commmit = requests.get(
+                first_commmit = self._request(
                     (response.headers['link'].split(" ")[2])[1:-2],
-                    headers=self.header_request)
+                    'core', self.header_request)
                 if first_commmit.status_code == 500:
                     print('Server Error: waiting for 60 seconds and retrying ...')
                     time.sleep(60)
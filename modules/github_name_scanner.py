@@ -0,0 +1,146 @@
+''' This module contains the GitHubNameScanner class
+    see class doc for more information '''
+
+import re
+import zlib
+from pymongo import UpdateOne
+
+
+class GitHubNameScanner():
+    '''
+
+    .. class:: GitHubNameScanner
+
+    The GitHubNameScanner class looks up GitHub repository full names and
+    repository owners in the text fragments of the publications with one
+    pass over the publications. Links to GitHub sites, e.g.
+    github.com/topics, are no repositories or owners and are ignored. The
+    names found in a publication are stored in its github_scan field,
+    together with a fingerprint of its text fragments and the version of
+    the scanner. If neither the fragments nor the scanner changed, the
+    stored names are returned without scanning the publication again.
+    A stored scan marks the names of the publication as processed, so the
+    caller stores the scans once their results are written.
+
+    :param collection: publication collection.
+    :type collection: Collection
+    '''
+
+    # version of the scanner, a new version invalidates the stored names
+    VERSION = 1
+    # text fragments of a publication, that are scanned
+    FRAGMENTS = ['summary', 'full_text_extract', 'summary_detail', 'arxiv_comment']
+    # publication fields required for the reference entries
+    REFERENCE_FIELDS = ['source', 'doi', 'doi_from_link', 'arxiv_id', 'title']
+    # list of GitHub site names whose github link equals a valid owner link
+    GITHUB_SITES = ['explore', 'topics', 'trending', 'collections', 'events',
+                    'features', 'join', 'login', 'search', 'about', 'showcases',
+                    'marketplace']
+    # regular expression for a full repository name in a GitHub URL
+    PATTERN_REPO = re.compile(r'(?i)github\.com/ ?([a-z0-9][a-z0-9-]*/[a-z0-9_\.-]+)')
+    # regular expression for a repository owner in a GitHub URL
+    PATTERN_USER = re.compile(
+        r'(?i)github\.com/ ?([a-z0-9][a-z0-9-]*)/?(?:\s|\.|\)|\'|\"|$|\]|\;|\}|\,)')
+
+
+    def __init__(self, collection):
+        '''
+        Constructor method
+        '''
+
+        self.collection = collection
+        self.projection = {field: 1 for field in (self.FRAGMENTS + self.REFERENCE_FIELDS
+                                                  + ['github_scan'])}
+
+
+    def get_fingerprint(self, pub):
+        '''
+        The method returns a checksum of the text fragments of a publication.
+
+        :param pub: publication.
+        :type pub: dict
+        :returns: checksum.
+        :rtype: int
+        '''
+
+        checksum = 0
+        for fragment in self.FRAGMENTS:
+            if fragment in pub:
+                checksum = zlib.crc32((fragment + '\0' + str(pub[fragment]) + '\0')
+                                      .encode('utf-8'), checksum)
+        return checksum
+
+
+    def scan(self, pub):
+        '''
+        The method looks up the repository full names and the repository
+        owners in the text fragments of a publication. The names are
+        returned in the order of their first occurrence without duplicates.
+
+        :param pub: publication.
+        :type pub: dict
+        :returns: repository full names and owners.
+        :rtype: dict
+        '''
+
+        repos = []
+        owners = []
+        seen_repos = set()
+        seen_owners = set()
+        for fragment in [frag for frag in self.FRAGMENTS if frag in pub]:
+            if 'github' not in pub[fragment].lower():
+                continue
+            for name in self.PATTERN_REPO.findall(pub[fragment]):
+                if name not in seen_repos and name.split('/')[0] not in self.GITHUB_SITES:
+                    seen_repos.add(name)
+                    repos.append(name)
+            for name in self.PATTERN_USER.findall(pub[fragment]):
+                if name not in seen_owners and name not in self.GITHUB_SITES:
+                    seen_owners.add(name)
+                    owners.append(name)
+        return {'repos': repos, 'owners': owners}
+
+
+    def scan_publications(self, query=None):
+        '''
+        The generator method returns the names of all publications meeting
+        the query. Publications, whose text fragments changed since their
+        last scan, are scanned, the names of the other publications are
+        taken from the stored scan. For a scanned publication the scan to
+        be stored is returned, it is stored by save_scans, after the names
+        are processed.
+
+        :param query: characteristics to be met by the publications.
+        :type query: dict
+        :returns: publication, repository full names and owners, scan to
+                  be stored or None if the stored scan is valid.
+        :rtype: dict, dict, dict
+        '''
+
+        for pub in self.collection.get_entries(query or {}, self.projection):
+            fingerprint = self.get_fingerprint(pub)
+            stored = pub.get('github_scan') or {}
+            if (stored.get('version') == self.VERSION
+                    and stored.get('fingerprint') == fingerprint):
+                yield pub, {'repos': stored['repos'], 'owners': stored['owners']}, None
+                continue
+
+            names = self.scan(pub)
+            yield pub, names, dict(names, version=self.VERSION, fingerprint=fingerprint)
+
+
+    def save_scans(self, scans):
+        '''
+        The method stores the scans of the publications with one bulk
+        operation.
+
+        :param scans: publication ids with their scan.
+        :type scans: [(bson.objectid.ObjectId, dict)]
+        :returns: None
+        :rtype: None
+        '''
+
+        with self.collection.bulk():
+            for ident, scan in scans:
+                self.collection.write(UpdateOne({'_id': ident},
+                                                {'$set': {'github_scan': scan}}))
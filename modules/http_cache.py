@@ -0,0 +1,238 @@
+''' This module contains the HttpCache class
+    see class doc for more information '''
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class HttpCache():
+    '''
+
+    .. class:: HttpCache
+
+    The HttpCache class stores API responses together with their ETag and
+    Last-Modified validators in a SQLite file, keyed by the URL and the
+    Accept header. Repeated requests are sent as conditional requests, on a
+    304 response the cached body is served, which does not count against the
+    GitHub rate limit. Entries older than the maximum age are removed, and if
+    the cached bodies exceed the maximum size, the least recently used entries
+    are evicted. The cache may be shared by several threads.
+
+    :param path: path of the SQLite file.
+    :type path: str
+    :param max_size_mb: maximum size of the cached bodies in megabytes.
+    :type max_size_mb: int
+    :param max_age_days: maximum age of an entry in days.
+    :type max_age_days: int
+    '''
+
+    # headers, that do not apply to the decoded body served from the cache
+    IGNORED_HEADERS = ['content-encoding', 'content-length', 'transfer-encoding']
+
+
+    def __init__(self, path='cache/http_cache.sqlite', max_size_mb=2048, max_age_days=30):
+        '''
+        Constructor method
+        '''
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_size = max_size_mb * 1024 * 1024
+        self.max_age = max_age_days * 24 * 3600
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT, '
+            'body BLOB, size INTEGER, stored REAL, accessed REAL)')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self.evict()
+
+
+    @staticmethod
+    def get_key(url, accept):
+        '''
+        The method returns the cache key of a request.
+
+        :param url: requested URL.
+        :type url: str
+        :param accept: Accept header of the request.
+        :type accept: str
+        :returns: cache key.
+        :rtype: str
+        '''
+        return (accept or '') + ' ' + url
+
+
+    def lookup(self, url, accept):
+        '''
+        The method returns the cached entry of a request, if it exists and
+        has not expired.
+
+        :param url: requested URL.
+        :type url: str
+        :param accept: Accept header of the request.
+        :type accept: str
+        :returns: cached entry or None.
+        :rtype: dict
+        '''
+
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT etag, last_modified, headers, body, stored FROM responses '
+                'WHERE key = ?', (self.get_key(url, accept),)).fetchone()
+        if not row or row[4] < time.time() - self.max_age:
+            return None
+        return {'key': self.get_key(url, accept), 'url': url,
+                'etag': row[0], 'last_modified': row[1],
+                'headers': json.loads(row[2]), 'body': row[3]}
+
+
+    @staticmethod
+    def get_validators(entry):
+        '''
+        The method returns the headers of a conditional request for the
+        cached entry.
+
+        :param entry: cached entry.
+        :type entry: dict
+        :returns: request headers.
+        :rtype: dict
+        '''
+
+        validators = {}
+        if entry and entry['etag']:
+            validators['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            validators['If-Modified-Since'] = entry['last_modified']
+        return validators
+
+
+    def get_response(self, entry, response):
+        '''
+        The method serves a cached entry for a 304 response. The returned
+        response contains the cached body and headers, updated with the
+        headers of the 304 response, e.g. the rate limit information.
+
+        :param entry: cached entry.
+        :type entry: dict
+        :param response: 304 response of the conditional request.
+        :type response: requests.models.Response
+        :returns: response with the cached body.
+        :rtype: requests.models.Response
+        '''
+
+        cached = requests.models.Response()
+        cached.status_code = 200
+        cached.reason = 'OK'
+        cached.url = entry['url']
+        cached.headers = CaseInsensitiveDict(entry['headers'])
+        cached.headers.update(response.headers)
+        cached.encoding = get_encoding_from_headers(cached.headers)
+        cached._content = entry['body']
+        cached.request = response.request
+        with self.lock:
+            self.hits = self.hits + 1
+            # the entry was revalidated, so its age starts anew
+            self.connection.execute(
+                'UPDATE responses SET stored = ?, accessed = ? WHERE key = ?',
+                (time.time(), time.time(), entry['key']))
+            self.connection.commit()
+        return cached
+
+
+    def store(self, url, accept, response):
+        '''
+        The method stores a successful response, if it carries an ETag
+        or a Last-Modified header, and counts the request as cache miss.
+
+        :param url: requested URL.
+        :type url: str
+        :param accept: Accept header of the request.
+        :type accept: str
+        :param response: response to be stored.
+        :type response: requests.models.Response
+        :returns: None
+        :rtype: None
+        '''
+
+        with self.lock:
+            self.misses = self.misses + 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        headers = {key: value for key, value in response.headers.items()
+                   if key.lower() not in self.IGNORED_HEADERS}
+        body = response.content
+        now = time.time()
+        key = self.get_key(url, accept)
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, etag, last_modified, json.dumps(headers), body, len(body), now, now))
+            self.connection.commit()
+            self.size = self.size + len(body) - (row[0] if row else 0)
+        if self.size > self.max_size:
+            self.evict()
+
+
+    def evict(self):
+        '''
+        The method removes the expired entries and, as long as the cached
+        bodies exceed the maximum size, the least recently used entries.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        with self.lock:
+            cursor = self.connection.execute(
+                'DELETE FROM responses WHERE stored < ?', (time.time() - self.max_age,))
+            self.evictions = self.evictions + max(cursor.rowcount, 0)
+            self.size = self.connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            while self.size > self.max_size:
+                rows = self.connection.execute(
+                    'SELECT key, size FROM responses ORDER BY accessed LIMIT 100').fetchall()
+                if not rows:
+                    break
+                self.connection.executemany(
+                    'DELETE FROM responses WHERE key = ?', [(row[0],) for row in rows])
+                self.evictions = self.evictions + len(rows)
+                self.size = self.size - sum(row[1] for row in rows)
+            self.connection.commit()
+
+
+    def get_statistics(self):
+        '''
+        The method returns the number of cache hits, misses, and evictions,
+        as well as the number and size of the cached entries.
+
+        :returns: cache statistics.
+        :rtype: dict
+        '''
+
+        with self.lock:
+            entries = self.connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': entries,
+                    'size_mb': round(self.size / 1024 / 1024, 2)}
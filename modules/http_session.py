@@ -0,0 +1,131 @@
+''' This module provides the HTTP session shared by all harvesters
+    see class and function docs for more information '''
+
+import threading
+from os import getpid, path
+import requests
+from requests.adapters import HTTPAdapter
+import yaml
+
+
+class HttpSession(requests.Session):
+    '''
+
+    .. class:: HttpSession
+
+    The HttpSession class keeps the connections to the requested hosts
+    alive, so consecutive API calls reuse the TCP and TLS connection.
+    Each host gets its own connection pool with a limited number of
+    connections, responses are requested gzip compressed, and every
+    request has a timeout, if no other timeout is given.
+
+    :param timeout: connect and read timeout in seconds.
+    :type timeout: (float, float)
+    :param pool_maxsize: maximum number of connections per host.
+    :type pool_maxsize: int
+    :param max_retries: retries of failed connection attempts.
+    :type max_retries: int
+    '''
+
+    def __init__(self, timeout=(10, 60), pool_maxsize=10, max_retries=3):
+        '''
+        Constructor method
+        '''
+
+        super().__init__()
+        self.timeout = tuple(timeout) if isinstance(timeout, list) else timeout
+        self.headers['Accept-Encoding'] = 'gzip, deflate'
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize,
+                              max_retries=max_retries, pool_block=True)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+
+    def request(self, method, url, *args, **kwargs):
+        '''
+        Sends the request with the default timeout of the session,
+        if no timeout is given.
+        '''
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+
+class ForwardingAdapter(HTTPAdapter):
+    '''
+
+    .. class:: ForwardingAdapter
+
+    The ForwardingAdapter class sends the requests for an URL prefix to
+    another base URL, e.g. a local stand-in server for tests.
+
+    :param prefix: URL prefix to be replaced.
+    :type prefix: str
+    :param target: base URL, that replaces the prefix.
+    :type target: str
+    '''
+
+    def __init__(self, prefix, target, **kwargs):
+        '''
+        Constructor method
+        '''
+
+        super().__init__(**kwargs)
+        self.prefix = prefix
+        self.target = target
+
+
+    def send(self, request, *args, **kwargs):
+        '''
+        Sends the request to the target URL.
+        '''
+        if request.url.startswith(self.prefix):
+            request.url = self.target + request.url[len(self.prefix):]
+        return super().send(request, *args, **kwargs)
+
+
+
+_SESSION = None
+_PID = None
+_LOCK = threading.Lock()
+
+
+def get_session():
+    '''
+    The function returns the HTTP session of the process. It is created
+    with the http parameters of the configuration file, if available.
+    A forked worker process creates its own session.
+
+    :returns: shared HTTP session.
+    :rtype: HttpSession
+    '''
+
+    global _SESSION, _PID
+    with _LOCK:
+        if _SESSION is None or _PID != getpid():
+            params = {}
+            if path.exists('config.yaml'):
+                with open('config.yaml', 'r') as stream:
+                    try:
+                        params = yaml.safe_load(stream).get('http') or {}
+                    except yaml.YAMLError as exc:
+                        print(exc)
+            _SESSION = HttpSession(**params)
+            _PID = getpid()
+        return _SESSION
+
+
+def forward(prefix, target):
+    '''
+    The function mounts a forwarding adapter in the shared session, so
+    all requests starting with the prefix are sent to the target URL.
+
+    :param prefix: URL prefix, e.g. https://api.github.com/.
+    :type prefix: str
+    :param target: base URL, e.g. http://localhost:8080/.
+    :type target: str
+    :returns: None
+    :rtype: None
+    '''
+
+    get_session().mount(prefix, ForwardingAdapter(prefix, target))
@@ -0,0 +1,274 @@
+''' This module contains the RateLimiter and RateLimiterPool classes
+    see class doc for more information '''
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def get_retry_after(headers):
+    '''
+    The function returns the waiting time of the Retry-After header, which
+    is given either in seconds or as HTTP date.
+
+    :param headers: Response headers.
+    :type headers: requests.structures.CaseInsensitiveDict
+    :returns: Waiting time in seconds or None, if the header is missing or invalid.
+    :rtype: float
+    '''
+
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+
+class RateLimiter():
+    '''
+
+    .. class:: RateLimiter
+
+    The RateLimiter class paces the requests against one API rate limit,
+    e.g. the GitHub core or search limit. It works as a token bucket,
+    whose refill rate spreads the remaining requests of the current
+    window evenly over the time until the window is reset. The state is
+    updated from the rate limit headers of every response, so the pacing
+    adapts to requests of other processes using the same token, and a
+    secondary rate limit (Retry-After) blocks all requests until it ends.
+    The limiter may be shared by several threads.
+
+    :param limit: maximum number of requests per window.
+    :type limit: int
+    :param window: length of a rate limit window in seconds.
+    :type window: int
+    :param burst: number of requests that may be sent without pacing.
+    :type burst: int
+    '''
+
+    def __init__(self, limit, window, burst=1):
+        '''
+        Constructor method
+        '''
+
+        self.limit = limit
+        self.window = window
+        self.burst = burst
+        # state of the current window, updated by the response headers
+        self.remaining = limit
+        self.used = 0
+        self.reset = time.time() + window
+        # theoretical time of the next request, if the budget is spread
+        self.next_slot = 0
+        # end of a secondary rate limit
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+
+    def __get_schedule(self, now):
+        '''
+        The method returns the earliest start time for the next request
+        and the interval between two requests. If the budget of the current
+        window is exhausted, the requests start after the reset and are
+        spread over the next window.
+
+        :param now: current time in epoch seconds.
+        :type now: float
+        :returns: start time, interval in seconds.
+        :rtype: float, float
+        '''
+
+        if now >= self.reset:
+            # the window is over, until the next response tells otherwise
+            # the full budget is assumed for the new window
+            self.remaining = self.limit
+            self.reset = now + self.window
+        if self.remaining > 0:
+            return now, max(self.reset - now, 1) / self.remaining
+        return self.reset + 1, self.window / max(self.limit, 1)
+
+
+    def get_interval(self):
+        '''
+        The method returns the current pacing interval in seconds.
+
+        :returns: Interval between two requests in seconds.
+        :rtype: float
+        '''
+
+        with self.lock:
+            return self.__get_schedule(time.time())[1]
+
+
+    def get_available_time(self):
+        '''
+        The method returns the time, at which the next request could be
+        sent without waiting.
+
+        :returns: Time in epoch seconds.
+        :rtype: float
+        '''
+
+        with self.lock:
+            start, interval = self.__get_schedule(time.time())
+            return max(start, self.next_slot - (self.burst - 1) * interval,
+                       self.blocked_until)
+
+
+    def acquire(self):
+        '''
+        The method reserves the next request slot and sleeps until it is
+        reached. The slot is reserved while holding the lock, the sleeping
+        is done without it, so other threads may reserve the following slots.
+
+        :returns: Seconds waited.
+        :rtype: float
+        '''
+
+        with self.lock:
+            now = time.time()
+            start, interval = self.__get_schedule(now)
+            next_slot = max(self.next_slot, start, self.blocked_until)
+            slot = max(start, next_slot - (self.burst - 1) * interval, self.blocked_until)
+            self.next_slot = next_slot + interval
+            self.remaining = self.remaining - 1
+
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+            return wait
+        return 0
+
+
+    def update(self, headers):
+        '''
+        The method updates the state of the rate limit window from the
+        headers of a response: X-RateLimit-Limit, X-RateLimit-Remaining,
+        X-RateLimit-Reset and X-RateLimit-Used for the primary rate limit,
+        Retry-After for a secondary rate limit. The Crossref API states its
+        rate limit with X-Rate-Limit-Limit and X-Rate-Limit-Interval, e.g. 1s.
+
+        :param headers: Response headers.
+        :type headers: requests.structures.CaseInsensitiveDict
+        :returns: None
+        :rtype: None
+        '''
+
+        with self.lock:
+            for header, field in [('X-RateLimit-Limit', 'limit'),
+                                  ('X-RateLimit-Remaining', 'remaining'),
+                                  ('X-RateLimit-Reset', 'reset'),
+                                  ('X-RateLimit-Used', 'used'),
+                                  ('X-Rate-Limit-Limit', 'limit'),
+                                  ('X-Rate-Limit-Interval', 'window')]:
+                try:
+                    setattr(self, field, int(headers[header].rstrip('s')))
+                except (KeyError, ValueError):
+                    continue
+            wait = get_retry_after(headers)
+            if wait is not None:
+                self.blocked_until = time.time() + wait
+
+
+    def block(self, seconds):
+        '''
+        The method blocks all requests for the given number of seconds,
+        e.g. after an overload response without Retry-After header.
+
+        :param seconds: Blocking time in seconds.
+        :type seconds: float
+        :returns: None
+        :rtype: None
+        '''
+
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+
+
+class RateLimiterPool():
+    '''
+
+    .. class:: RateLimiterPool
+
+    The RateLimiterPool class distributes the requests of one rate limit
+    category over several authentication tokens, each with its own rate
+    limiter. A request is assigned to the token, whose limiter allows the
+    earliest request, so exhausted tokens are parked until their window
+    is reset, while the other tokens are used.
+
+    :param limiters: rate limiter for each token.
+    :type limiters: dict
+    '''
+
+    def __init__(self, limiters):
+        '''
+        Constructor method
+        '''
+
+        self.limiters = limiters
+        self.lock = threading.Lock()
+
+
+    def acquire(self):
+        '''
+        The method selects the token with the earliest available request
+        slot and waits until its limiter releases the request.
+
+        :returns: Selected token.
+        :rtype: str
+        '''
+
+        with self.lock:
+            token = min(self.limiters,
+                        key=lambda key: self.limiters[key].get_available_time())
+        self.limiters[token].acquire()
+        return token
+
+
+    def update(self, token, headers):
+        '''
+        The method updates the rate limiter of the token with the
+        headers of a response.
+
+        :param token: Token the request was sent with.
+        :type token: str
+        :param headers: Response headers.
+        :type headers: requests.structures.CaseInsensitiveDict
+        :returns: None
+        :rtype: None
+        '''
+
+        self.limiters[token].update(headers)
+
+
+    def get_remaining(self):
+        '''
+        The method returns the number of remaining requests of all tokens
+        in their current windows.
+
+        :returns: Number of remaining requests.
+        :rtype: int
+        '''
+
+        return sum(max(limiter.remaining, 0) for limiter in self.limiters.values())
+
+
+    def get_interval(self):
+        '''
+        The method returns the pacing interval of the pool, as the tokens
+        are used in parallel, their request rates add up.
+
+        :returns: Interval between two requests in seconds.
+        :rtype: float
+        '''
+
+        rate = sum(1 / limiter.get_interval() for limiter in self.limiters.values())
+        return 1 / rate
@@ -0,0 +1,158 @@
+''' This module contains the ReadmeHarvester class
+    see class doc for more information '''
+
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from pymongo import UpdateOne
+
+
+class ReadmeHarvester():
+    '''
+
+    .. class:: ReadmeHarvester
+
+    The ReadmeHarvester class requests the Readme files of all repositories
+    without a readme field. The candidates are read from the repository
+    collection in pages sorted by the document id, only the repository id
+    and source are returned. The Readme files of a page are requested
+    concurrently by a pool of threads, which share one harvester per source,
+    and thereby its rate limiters, HTTP cache, and connections. The results
+    of a page are written with one bulk operation. As only repositories
+    without a readme field are selected, an interrupted run is resumed by
+    starting it again. If a repository does not contain a Readme file (404),
+    the note 'empty readme' is stored, if the request fails, e.g. because of
+    a connection error, an exhausted rate limit, or a server error, the
+    repository is left for the next run. If the configured search terms
+    are given, the search terms searching the Readme file, which were merged
+    with another search term into one search query, are attributed to the
+    repositories, whose Readme file matches them, see
+    GitHubHarvester.match_readme_keywords.
+
+    :param collection: repository collection.
+    :type collection: RepoCollection
+    :param harvesters: harvester for each repository source.
+    :type harvesters: dict
+    :param workers: number of concurrent requests.
+    :type workers: int
+    :param page_size: number of repositories per page and bulk operation.
+    :type page_size: int
+    :param keywords: configured search terms.
+    :type keywords: [str]
+    '''
+
+    # note stored for repositories without Readme file
+    EMPTY_README = 'empty readme'
+
+
+    def __init__(self, collection, harvesters, workers=8, page_size=500, keywords=None):
+        '''
+        Constructor method
+        '''
+
+        self.collection = collection
+        self.harvesters = harvesters
+        self.workers = workers
+        self.page_size = page_size
+        self.keywords = keywords
+
+
+    def get_candidates(self):
+        '''
+        The method yields pages of repositories without a readme field. Each
+        page is read with its own short lived cursor, which continues after
+        the last document id of the preceding page, so the cursor does not
+        time out while the Readme files are requested.
+
+        :returns: pages of repositories with id, source, keywords, and document id.
+        :rtype: generator
+        '''
+
+        query = {'readme': None, 'source': {'$in': list(self.harvesters)}}
+        last_id = None
+        while True:
+            if last_id:
+                query['_id'] = {'$gt': last_id}
+            page = list(self.collection.get_entries(query, {'id': 1, 'source': 1, 'keywords': 1},
+                                                    self.page_size, sort=[('_id', 1)],
+                                                    limit=self.page_size))
+            if not page:
+                return
+            last_id = page[-1]['_id']
+            yield page
+
+
+    def get_readme(self, repo):
+        '''
+        The method requests the Readme file of a repository with the
+        harvester of its source.
+
+        :param repo: repository with id and source.
+        :type repo: dict
+        :returns: Readme file, the note 'empty readme' if the repository has
+                  no Readme file (404), or None if the request failed.
+        :rtype: str
+        '''
+
+        try:
+            response = self.harvesters[repo['source']].get_readme_response(str(repo['id']))
+        except requests.exceptions.RequestException as error:
+            print('Readme file of repository', repo['id'], 'not requested:', error)
+            return None
+        if response is None:
+            return None
+        if response.status_code == 404:
+            return self.EMPTY_README
+        if response.status_code != 200:
+            print('Readme file of repository', repo['id'], 'not requested, status',
+                  response.status_code)
+            return None
+        return response.text
+
+
+    def match_readme_keywords(self, repo, readme):
+        '''
+        The method returns the configured search terms searching the Readme
+        file, that the harvested Readme file of a repository matches, if
+        its harvester attributes search terms to Readme files.
+
+        :param repo: repository with source and keywords.
+        :type repo: dict
+        :param readme: Readme file or the note 'empty readme'.
+        :type readme: str
+        :returns: matching search terms.
+        :rtype: [str]
+        '''
+
+        harvester = self.harvesters[repo['source']]
+        if (not self.keywords or readme == self.EMPTY_README
+                or not hasattr(harvester, 'match_readme_keywords')):
+            return []
+        return harvester.match_readme_keywords(self.keywords, repo.get('keywords'), readme)
+
+
+    def harvest(self, total=None):
+        '''
+        The method requests and stores the Readme files of all repositories
+        without a readme field.
+
+        :param total: number of candidates, only used for the progress.
+        :type total: int
+        :returns: number of stored Readme files.
+        :rtype: int
+        '''
+
+        counter = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for page in self.get_candidates():
+                with self.collection.bulk(self.page_size):
+                    for repo, readme in zip(page, executor.map(self.get_readme, page)):
+                        if readme is None:
+                            continue
+                        update = {'$set': {'readme': readme}}
+                        keys = self.match_readme_keywords(repo, readme)
+                        if keys:
+                            update['$addToSet'] = {'keywords': {'$each': keys}}
+                        self.collection.write(UpdateOne({'_id': repo['_id']}, update))
+                        counter = counter + 1
+                print('Processed', counter, 'of', total if total else 'unknown')
+        return counter
@@ -0,0 +1,863 @@
+''' This module contains the steps of the research software identification
+    and the RsIdentifier class, which runs them as a pipeline
+    see function and class docs for more information '''
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor, as_completed,
+                                wait, FIRST_COMPLETED)
+from datetime import datetime
+from itertools import islice
+from dateutil.relativedelta import relativedelta
+from pymongo import DeleteOne, UpdateOne
+import yaml
+import modules.auxiliary_functions as aux
+import modules.database as db
+from modules.crossref_client import CrossrefClient
+from modules.github_harvester import GitHubHarvester
+from modules.github_graphql_harvester import GitHubGraphQLHarvester
+from modules.github_name_scanner import GitHubNameScanner
+from modules.http_cache import HttpCache
+from modules.subject_index import SubjectIndex
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+# repository fields required to extract the DOIs
+DOI_FIELDS = {'id': 1, 'full_name': 1, 'source': 1, 'language': 1,
+              'description': 1, 'readme': 1}
+# number of repositories, whose texts are searched for DOIs at once
+DOI_BATCH_SIZE = 100
+# number of publication scans, that are stored after the upserts of their repositories
+SCAN_BATCH_SIZE = 1000
+
+# state of a worker process, set by its initializer
+_REPOSITORIES = None
+_KNOWN_IDS = None
+
+
+def _init_worker(repositories, known_ids):
+    '''
+    The function sets the repository collection and the ids of the
+    repositories, that are already research software candidates, for the
+    worker process.
+
+    :param repositories: repository collection.
+    :type repositories: RepoCollection
+    :param known_ids: ids of the research software repository candidates.
+    :type known_ids: set
+    :returns: None
+    :rtype: None
+    '''
+
+    global _REPOSITORIES, _KNOWN_IDS
+    _REPOSITORIES = repositories
+    _KNOWN_IDS = known_ids
+
+
+def _extract_dois(query):
+    '''
+    The function extracts the DOIs of the repositories in the given id
+    range, that are no research software repository candidates yet. Only
+    the repositories with at least one DOI are returned, without their
+    description and Readme file.
+
+    :param query: id range of the repositories.
+    :type query: dict
+    :returns: number of processed repositories, repositories with DOIs.
+    :rtype: int, [dict]
+    '''
+
+    counter = 0
+    results = []
+    batch = []
+    for repo in _REPOSITORIES.get_entries(query, DOI_FIELDS, DOI_BATCH_SIZE):
+        counter = counter + 1
+        if repo['id'] not in _KNOWN_IDS:
+            batch.append(repo)
+        if len(batch) == DOI_BATCH_SIZE:
+            results.extend(_extract_batch_dois(batch))
+            batch = []
+    results.extend(_extract_batch_dois(batch))
+    return counter, results
+
+
+def _extract_batch_dois(batch):
+    '''
+    The function extracts the DOIs of the descriptions and Readme files
+    of the given repositories with one search per regular expression.
+
+    :param batch: repositories with their description and Readme file.
+    :type batch: [dict]
+    :returns: repositories with DOIs.
+    :rtype: [dict]
+    '''
+
+    texts = []
+    for repo in batch:
+        texts.extend([repo.get('description'), repo.get('readme')])
+    found = aux.extract_dois(texts)
+
+    results = []
+    for position, repo in enumerate(batch):
+        elems = found[2 * position] + found[2 * position + 1]
+        if elems:
+            results.append({'id': repo['id'],
+                            'full_name': repo['full_name'],
+                            'source': repo['source'],
+                            'language': repo.get('language'),
+                            'dois': list(set(elems))})
+    return results
+
+
+def identify_dois(repo_table, rs_repo_table, rs_publication_table, processes=None):
+    '''
+    The function looks up DOIs in the descriptions and Readme files of the
+    repositories. The repository collection is split into ranges of
+    document ids, which are processed by a pool of worker processes. The
+    workers return the repositories with DOIs, which are stored by the
+    calling process as the only writer: the repositories are added to the
+    research software repository candidates and the DOIs to the research
+    software artifacts. Repositories, that are already candidates, are
+    skipped.
+
+    :param repo_table: repository collection.
+    :type repo_table: RepoCollection
+    :param rs_repo_table: research software repository collection.
+    :type rs_repo_table: RsRepoCollection
+    :param rs_publication_table: research software artifact collection.
+    :type rs_publication_table: RsArtifactCollection
+    :param processes: number of worker processes, by default the number of cores.
+    :type processes: int
+    :returns: number of repositories with DOIs.
+    :rtype: int
+    '''
+
+    processes = processes or os.cpu_count()
+    total = repo_table.get_number_of_entries({})
+    known_ids = set(repo['id'] for repo in rs_repo_table.get_entries({}, {'id': 1}, 10000))
+    # more ranges than processes, so a slow range does not delay the others
+    ranges = repo_table.get_id_ranges(processes * 4)
+
+    counter = 0
+    found = 0
+    # the workers are forked, so they inherit the database parameters
+    # and create their own database clients
+    with ProcessPoolExecutor(max_workers=processes,
+                             mp_context=multiprocessing.get_context('fork'),
+                             initializer=_init_worker,
+                             initargs=(repo_table, known_ids)) as executor:
+        futures = [executor.submit(_extract_dois, query) for query in ranges]
+        with rs_repo_table.bulk(), rs_publication_table.bulk():
+            for future in as_completed(futures):
+                processed, results = future.result()
+                for repo in results:
+                    dois = [{'id': doi, 'mode': 'doi'} for doi in repo['dois']]
+                    # add repository to rsRepositories database table
+                    rs_repo_table.save_repo(repo['id'],
+                                            repo['full_name'],
+                                            dois,
+                                            repo['source'],
+                                            repo['source'],
+                                            repo['language'])
+                    # add DOIs to rsPublications database table
+                    rs_publication_table.save_publication(dois, repo['full_name'])
+                counter = counter + processed
+                found = found + len(results)
+                LOGGER.info('dois: processed %i of %i', counter, total)
+    return found
+
+
+
+class RsIdentifier():
+    '''
+
+    .. class:: RsIdentifier
+
+    The RsIdentifier class runs the steps of the research software
+    identification, which are declared as a dependency graph in STEPS.
+    Each step names its method, the steps it requires, and the external
+    budget it draws on, e.g. the GitHub or Crossref rate limit. A step is
+    started as soon as the steps it requires are finished, steps drawing
+    on different budgets run concurrently in threads, steps with the same
+    budget one after another. Required steps, that are not part of a run,
+    are assumed to be done. If a step fails, the steps requiring it are
+    skipped. The dois step forks worker processes and therefore runs alone.
+    The progress is reported by the logger of the module.
+
+    :param params: parameters of the configuration file, by default loaded
+                   from config.yaml.
+    :type params: dict
+    '''
+
+    # method, required steps, and budget of each step
+    STEPS = {
+        'dois': ('find_dois', [], 'exclusive'),
+        'repo_name': ('extract_names', [], 'database'),
+        'user_name': ('harvest_owners', ['repo_name'], 'github'),
+        'metadata': ('request_metadata', ['dois', 'repo_name', 'user_name'], 'github'),
+        'content': ('check_content', ['metadata'], 'github'),
+        'commits': ('request_commits', ['content'], 'github'),
+        'crossref': ('request_doi_metadata', ['metadata'], 'crossref'),
+        'subject': ('look_up_subjects', ['crossref'], 'database'),
+        'subject_arxiv': ('look_up_arxiv_subjects', ['subject'], 'database')
+    }
+    # harvester classes, that may be specified in the configuration file
+    HARVESTERS = {'GitHubHarvester': GitHubHarvester,
+                  'GitHubGraphQLHarvester': GitHubGraphQLHarvester}
+
+
+    def __init__(self, params=None):
+        '''
+        Constructor method
+        '''
+
+        if params is None:
+            with open('config.yaml', 'r') as stream:
+                params = yaml.safe_load(stream)
+        self.params = params
+        self.steps = set(params['rsidentifier'])
+        self.repo_table = db.RepoCollection()
+        self.publication_table = db.Collection('publications')
+        self.rs_repo_table = db.RsRepoCollection()
+        self.rs_publication_table = db.RsArtifactCollection()
+        self.work_queue = db.WorkQueueCollection()
+        self.http_cache = HttpCache(**params['http_cache'])
+        self.complementers = {}
+
+
+    def get_harvester(self, source, role='class'):
+        '''
+        The method instantiates the harvester of a repository hosting
+        service with the class given in the configuration file.
+
+        :param source: repository hosting service, e.g. github.
+        :type source: str
+        :param role: class entry of the service, class or complementer.
+        :type role: str
+        :returns: harvester.
+        :rtype: RepositoryHarvester | RepositoryComplementer
+        '''
+
+        options = self.params['supported_sources'][source]
+        return self.HARVESTERS[options.get(role, options['class'])](
+            self.params['authentication'][source], cache=self.http_cache)
+
+
+    def get_complementer(self, source):
+        '''
+        The method returns the complementer of the repository hosting
+        service, it is instantiated once.
+
+        :param source: repository hosting service, e.g. github.
+        :type source: str
+        :returns: complementer.
+        :rtype: RepositoryComplementer
+        '''
+
+        if source not in self.complementers:
+            self.complementers[source] = self.get_harvester(source, 'complementer')
+        return self.complementers[source]
+
+
+    def prefetched(self, repos, size=100):
+        '''
+        The generator method yields the repositories, after the complementer
+        of their hosting service prefetched their information in chunks of
+        the given size.
+
+        :param repos: repositories with full name and source.
+        :type repos: iterator
+        :param size: number of repositories per chunk.
+        :type size: int
+        :returns: repositories.
+        :rtype: generator
+        '''
+
+        repos = iter(repos)
+        while True:
+            chunk = list(islice(repos, size))
+            if not chunk:
+                return
+            for source in set(repo['source'] for repo in chunk):
+                self.get_complementer(source).prefetch(
+                    [repo['full_name'] for repo in chunk if repo['source'] == source])
+            yield from chunk
+
+
+    @staticmethod
+    def log_progress(step, counter, total, every):
+        '''
+        The method logs the progress of a step every given number of entries.
+
+        :param step: step name.
+        :type step: str
+        :param counter: number of processed entries.
+        :type counter: int
+        :param total: number of entries.
+        :type total: int
+        :param every: number of entries between two messages.
+        :type every: int
+        :returns: None
+        :rtype: None
+        '''
+
+        if counter % every == 0 or counter == total:
+            LOGGER.info('%s: processed %i of %i', step, counter, total)
+
+
+    def find_dois(self):
+        '''
+        The method looks up the DOIs in the descriptions and Readme files
+        of the repositories, see identify_dois.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        found = identify_dois(self.repo_table, self.rs_repo_table, self.rs_publication_table)
+        LOGGER.info('dois: repositories with DOIs: %i', found)
+
+
+    def extract_names(self):
+        '''
+        The method extracts the repository names and the repository owners
+        from the publications with one pass. The repositories are added to
+        the research software collections, if the repo_name step is part of
+        the identification, the owners are added to the work queue of the
+        user_name step, if it is part of the identification.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        counter = 0
+        total = self.publication_table.get_number_of_entries({})
+        scanner = GitHubNameScanner(self.publication_table)
+        scans = []
+
+        # the names of unchanged publications are taken from their stored scan,
+        # the upserts are buffered and sent as bulk operations, the scans are
+        # stored after the upserts of their repositories are sent, so a stored
+        # scan implies, that its repositories are added
+        with self.rs_repo_table.bulk() as repo_writer, \
+             self.rs_publication_table.bulk() as publication_writer, self.work_queue.bulk():
+            for pub, names, scan in scanner.scan_publications():
+                counter = counter + 1
+                self.log_progress('repo_name', counter, total, 500)
+
+                # the repositories of unchanged publications are already added,
+                # the scans are only stored, if the repositories are added
+                if 'repo_name' in self.steps and scan:
+                    for repo in names['repos']:
+                        ident = aux.create_reference_entry(pub, True)
+                        self.rs_repo_table.save_repo(None, repo, [ident], 'github',
+                                                     pub['source'])
+                        self.rs_publication_table.save_publication([ident], repo)
+                    scans.append((pub['_id'], scan))
+
+                # the repositories of the owners are requested in the user_name step,
+                # owners already added keep their publication
+                if 'user_name' in self.steps:
+                    publication = {field: pub[field] for field in scanner.REFERENCE_FIELDS
+                                   if field in pub}
+                    for user in names['owners']:
+                        self.work_queue.enqueue('user_name', user, {'publication': publication})
+
+                if len(scans) >= SCAN_BATCH_SIZE:
+                    repo_writer.flush()
+                    publication_writer.flush()
+                    scanner.save_scans(scans)
+                    scans = []
+
+            repo_writer.flush()
+            publication_writer.flush()
+            scanner.save_scans(scans)
+
+
+    def harvest_owners(self):
+        '''
+        The method requests the repositories of the owners in the work
+        queue and adds them to the repository collection and the research
+        software collections. The items are keyed by the owner, so owners
+        extracted again from new publications are not requested again,
+        unless the user_name step is reset with work_queue.reset.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        counter = 0
+        total = self.work_queue.get_progress('user_name')['pending']
+        remaining_requests = -1
+        current = self.get_harvester('github')
+
+        for item in self.work_queue.claim_items('user_name'):
+            user = item['key']
+            publication = item['payload']['publication']
+            next_url = None
+            counter = counter + 1
+            self.log_progress('user_name', counter, total, 25)
+
+            # check if user candidate is one of the GitHub site names
+            if user in GitHubNameScanner.GITHUB_SITES:
+                self.work_queue.complete('user_name', user)
+                continue
+
+            while True:
+                response, remaining_requests = current.get_api_response(
+                    'user', user, remaining_requests, next_url)
+                # no valid user
+                if not response:
+                    break
+                # the upserts of one page are sent as bulk operations
+                with self.repo_table.bulk(), self.rs_repo_table.bulk(), \
+                     self.rs_publication_table.bulk():
+                    for repo in response.json():
+                        self.repo_table.save_repo(repo, 'github.com', 'github', datetime.now())
+                        ident = aux.create_reference_entry(publication, True)
+                        self.rs_repo_table.save_repo(repo['id'], repo['full_name'], [ident],
+                                                     'github', publication['source'],
+                                                     repo['language'])
+                        self.rs_publication_table.save_publication([ident], repo['full_name'])
+
+                # check whether further pages are available
+                if 'link' in response.headers:
+                    next_url = current.get_next_page(response.headers['link'].split(','))
+                else:
+                    next_url = None
+                if not next_url:
+                    break
+            self.work_queue.complete('user_name', user)
+
+
+    def request_metadata(self):
+        '''
+        The method requests the metadata of the research software
+        repositories. Repositories, whose name is not found, even after
+        removing non alphanumeric suffixes, are removed. Afterwards the
+        repositories with the same id are merged with one consolidation pass.
+        New repositories are added to the work queue with their document id,
+        repositories completed in a preceding run are only requested again
+        after the metadata step is reset with work_queue.reset.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        remaining_requests = -1
+        total = self.rs_repo_table.get_number_of_entries({})
+        counter = 0
+
+        for repo in self.prefetched(self.work_queue.claim_entries(
+                'metadata', self.rs_repo_table, {}, self.rs_repo_table.STEP_FIELDS)):
+            reject = True
+            counter = counter + 1
+            self.log_progress('metadata', counter, total, 100)
+
+            # if repo metadata already requested, continue with next repo
+            repo_meta = self.repo_table.get_entry({'full_name': repo['full_name']},
+                                                  self.repo_table.CANDIDATE_FIELDS)
+            if repo_meta:
+                # duplicates of the id are merged after all repositories are requested
+                if not repo['id']:
+                    self.rs_repo_table.mod_entry({'_id': repo['_id']},
+                                                 {'$set': {'id': repo_meta['id']}})
+                self.work_queue.complete('metadata', repo['_id'])
+                continue
+
+            current = self.get_complementer(repo['source'])
+            name = repo['full_name']
+            while name:
+                response, remaining_requests = current.get_api_response(
+                    'metadata', name, remaining_requests)
+
+                # repository has metadata
+                if response and response.json():
+                    meta = response.json()
+                    self.repo_table.save_repo(meta, 'github.com', repo['source'], datetime.now())
+                    self.rs_repo_table.mod_entry(
+                        {'_id': repo['_id']},
+                        {'$set': {'id': meta['id'],
+                                  'full_name': meta['full_name'],
+                                  'language': meta['language']}})
+                    reject = False
+                    break
+                # repository does not exist, check whether the last char
+                # is not alphanumeric
+                name = aux.check_name_suffix(name)
+                meta_repo = self.repo_table.get_entry({'full_name': name},
+                                                      self.repo_table.CANDIDATE_FIELDS)
+                if meta_repo:
+                    if not repo['id']:
+                        self.rs_repo_table.mod_entry({'_id': repo['_id']},
+                                                     {'$set': {'id': meta_repo['id']}})
+                    reject = False
+                    break
+            if reject:
+                self.rs_repo_table.remove_entry({'_id': repo['_id']})
+            self.work_queue.complete('metadata', repo['_id'])
+
+        removed = self.rs_repo_table.consolidate_duplicates(self.repo_table.collection_name)
+        LOGGER.info('metadata: %i duplicate repositories merged', removed)
+
+
+    def check_content(self):
+        '''
+        The method removes the research software repositories without a
+        language, that only consist of Readme, License, and .gitignore files.
+        Repositories checked in a preceding run are skipped, even if their
+        checked_content flag was removed, until the content step is reset.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        query = {'$and': [{'checked_content': {'$exists': False}},
+                          {'language': None}]}
+        remaining_requests = -1
+        total = self.rs_repo_table.get_number_of_entries(query)
+        counter = 0
+
+        for repo in self.prefetched(self.work_queue.claim_entries(
+                'content', self.rs_repo_table, query, self.rs_repo_table.STEP_FIELDS)):
+            counter = counter + 1
+            self.log_progress('content', counter, total, 50)
+
+            current = self.get_complementer(repo['source'])
+            reject = False
+            name = repo['full_name']
+            while name:
+                reject, remaining_requests = current.has_no_possible_source_code_files(
+                    name, remaining_requests)
+                if not reject:
+                    self.rs_repo_table.mod_entry(
+                        {'_id': repo['_id']},
+                        {'$set': {'full_name': name, 'checked_content': True}})
+                    break
+
+                # repository does not exist, check whether the last char
+                # is not alphanumeric
+                name = aux.check_name_suffix(name)
+                if self.rs_repo_table.get_entry({'full_name': name}, ['_id']):
+                    break
+            if reject:
+                self.rs_repo_table.remove_entry({'_id': repo['_id']})
+            self.work_queue.complete('content', repo['_id'])
+
+
+    def request_commits(self):
+        '''
+        The method requests the dates of the first and last commit of the
+        research software repositories and derives their lifespan and
+        whether they are live, i.e. committed to within the last year.
+        To request the commits of already completed repositories again,
+        e.g. to refresh their lifespan, the commits step is reset.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        query = {'first_commit': {'$exists': False}}
+        total = self.rs_repo_table.get_number_of_entries(query)
+        remaining_requests = -1
+        counter = 0
+
+        for repo in self.prefetched(self.work_queue.claim_entries(
+                'commits', self.rs_repo_table, query, self.rs_repo_table.STEP_FIELDS)):
+            counter = counter + 1
+            self.log_progress('commits', counter, total, 25)
+
+            current = self.get_complementer(repo['source'])
+            reject, first_commit, last_commit, remaining_requests = current.get_first_commit(
+                repo['full_name'], remaining_requests)
+            if reject:
+                self.rs_repo_table.remove_entry({'full_name': repo['full_name']})
+                self.work_queue.complete('commits', repo['_id'])
+                continue
+
+            first = datetime.strptime(first_commit, '%Y-%m-%dT%H:%M:%SZ')
+            last = datetime.strptime(last_commit, '%Y-%m-%dT%H:%M:%SZ')
+            self.rs_repo_table.mod_entry(
+                {'_id': repo['_id']},
+                {'$set': {'first_commit': first_commit,
+                          'last_commit': last_commit,
+                          'live': last >= datetime.now() - relativedelta(years=1),
+                          'lifespan': (last - first).days}})
+            self.work_queue.complete('commits', repo['_id'])
+
+
+    def request_doi_metadata(self):
+        '''
+        The method requests the Crossref metadata of the DOIs in the
+        research software artifact collection with the Crossref client,
+        which looks up the DOIs in concurrent batches and resolves DOIs
+        without metadata by their alias or by removing non alphanumeric
+        suffixes. The lookups are stored in the DOI cache, so a rerun does
+        not request them again. The results of a chunk of DOIs are written with bulk
+        operations. DOIs without metadata are replaced in the references
+        of the repositories. Publications, whose lookup failed, are not
+        marked as checked and returned to the work queue with a delay, so
+        they are retried by a later run, when Crossref is available again,
+        and do not use up their attempts in this run. Publications
+        completed in a preceding run are not looked up again, unless the
+        crossref step is reset.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        query = {'$and': [{'identifier.mode': 'doi'},
+                          {'checked_doi': {'$exists': False}}]}
+        total = self.rs_publication_table.get_number_of_entries(query)
+        counter = 0
+        client = CrossrefClient(header=self.params['authentication'].get('crossref'),
+                                cache=db.DoiCacheCollection(**(self.params.get('doi_cache') or {})),
+                                **(self.params.get('crossref') or {}))
+        pubs = self.work_queue.claim_entries('crossref', self.rs_publication_table,
+                                             query, ['identifier'])
+
+        def is_known(doi):
+            return self.rs_publication_table.get_entry({'identifier.id': doi}, ['_id']) is not None
+
+        while True:
+            chunk = list(islice(pubs, client.batch_size * client.workers))
+            if not chunk:
+                return
+            replaced = []
+            failed = []
+            with self.rs_publication_table.bulk():
+                for pub, (doi, result) in zip(chunk, client.resolve_all(
+                        [pub['identifier']['id'] for pub in chunk], is_known)):
+                    counter = counter + 1
+                    self.log_progress('crossref', counter, total, 50)
+
+                    # the lookup failed, e.g. Crossref was overloaded, the
+                    # publication is left unchecked and claimed by a later run
+                    if result is None:
+                        failed.append(pub['_id'])
+                    # the truncated version of the DOI is already in the collection
+                    elif result['known']:
+                        self.rs_publication_table.write(DeleteOne({'_id': pub['_id']}))
+                        replaced.append((doi, None))
+                    # metadata are gathered, if DOI is resolved to another name, it is
+                    # updated in the collections
+                    elif result['message']:
+                        post = dict(result['message'], checked_doi=True)
+                        if result['doi'] != doi:
+                            post['identifier.id'] = result['doi']
+                            replaced.append((doi, {'id': result['doi'], 'mode': 'doi'}))
+                        self.rs_publication_table.write(UpdateOne({'_id': pub['_id']},
+                                                                  {'$set': post}))
+                    else:
+                        self.rs_publication_table.write(UpdateOne(
+                            {'_id': pub['_id']}, {'$set': {'checked_doi': True}}))
+
+            # replace the unidentifiable DOIs in the references of the repositories
+            # with the resolved DOI, an arxiv id, or a title, if available
+            for doi, ident in replaced:
+                for repo in self.rs_repo_table.get_entries({'references.id': {'$eq': doi}},
+                                                           ['_id']):
+                    self.rs_repo_table.update_doi(repo['_id'], doi, ident)
+            for ident in failed:
+                self.work_queue.release('crossref', ident, db.WorkQueueCollection.RETRY_DELAY)
+            if failed:
+                LOGGER.warning('crossref: lookup of %i DOIs failed, they are retried in '
+                               '%i seconds by a later run', len(failed),
+                               db.WorkQueueCollection.RETRY_DELAY)
+            self.work_queue.complete_items('crossref', [pub['_id'] for pub in chunk
+                                                        if pub['_id'] not in failed])
+
+
+    def look_up_subjects(self):
+        '''
+        The method looks up the subjects of the publications referenced by
+        DOI via their ISSN, ISBN, or container title in the publication
+        subject collection and adds them to the repositories. The subjects
+        are looked up in a subject index, which is loaded once, and the
+        referenced publications are fetched for a chunk of repositories
+        with one query. The subjects of completed repositories are only
+        looked up again after the subject step is reset, e.g. when the
+        publication subject collection was updated.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        subjects = SubjectIndex(db.Collection('publication_subjects'))
+        query = {'$and': [{'checked_subject': {'$exists': False}},
+                          {'references.mode': 'doi'}]}
+        total = self.rs_repo_table.get_number_of_entries(query)
+        counter = 0
+        repos = self.work_queue.claim_entries('subject', self.rs_repo_table,
+                                              query, ['references'])
+
+        while True:
+            chunk = list(islice(repos, 100))
+            if not chunk:
+                return
+            pubs = {}
+            for pub in self.rs_publication_table.get_entries(
+                    {'identifier.id': {'$in': list(set(
+                        ref['id'] for repo in chunk for ref in repo['references']))}},
+                    ['identifier', 'ISSN', 'ISBN', 'container-title'], 1000):
+                pubs.setdefault(pub['identifier']['id'], pub)
+
+            with self.rs_publication_table.bulk(), self.rs_repo_table.bulk():
+                for repo in chunk:
+                    counter = counter + 1
+                    self.log_progress('subject', counter, total, 100)
+                    for ref in repo['references']:
+                        pub = pubs.get(ref['id'])
+                        if not pub:
+                            continue
+                        for subject in subjects.get_subjects(pub):
+                            self.rs_publication_table.write(UpdateOne(
+                                {'_id': pub['_id']},
+                                {'$set': {'sub_subject': subject.get('subgroups', [None]),
+                                          'subject_asjc': subject['groups'],
+                                          'main_subject': subject['supergroup']}}))
+                            self.rs_repo_table.save_subject(repo['_id'], subject)
+                    self.rs_repo_table.write(UpdateOne({'_id': repo['_id']},
+                                                       {'$set': {'checked_subject': True}}))
+            # the items are only completed after their results are written
+            self.work_queue.complete_items('subject', [repo['_id'] for repo in chunk])
+
+
+    def look_up_arxiv_subjects(self):
+        '''
+        The method looks up the subjects of the arXiv publications
+        referenced by the repositories via their primary category. The
+        repositories are joined with their subjects by one aggregation and
+        the subjects are written with bulk operations.
+
+        :returns: None
+        :rtype: None
+        '''
+
+        arxiv_subjects_table = db.Collection('arxiv_subjects')
+        query = {'$and': [{'group': {'$in': ['arxiv']}},
+                          {'main_subject': {'$exists': False}}]}
+        total = self.rs_repo_table.get_number_of_entries(query)
+        repos = self.rs_repo_table.get_arxiv_subjects(
+            query, self.publication_table.collection_name, arxiv_subjects_table.collection_name)
+        updates = self.rs_repo_table.save_subjects(
+            (repo['_id'], subject) for repo in repos for subject in repo['subjects'])
+        LOGGER.info('subject_arxiv: %i subjects added to %i repositories without subject',
+                    updates, total)
+
+
+    def run_step(self, step):
+        '''
+        The method runs a single step and logs its duration. While it runs,
+        the leases of the work queue items it claimed are renewed.
+
+        :param step: step name.
+        :type step: str
+        :returns: None
+        :rtype: None
+        '''
+
+        LOGGER.info('%s: started', step)
+        start = time.time()
+        # the leases of the claimed entries are renewed while the step runs
+        with self.work_queue.renewing(step):
+            getattr(self, self.STEPS[step][0])()
+        LOGGER.info('%s: finished after %.0f s', step, time.time() - start)
+
+
+    def run(self, steps=None):
+        '''
+        The method runs the given steps, by default the steps of the
+        configuration file, along their dependency graph. The harvesting
+        steps new_repositories and new_publications are not part of the
+        pipeline and are skipped. The owners are extracted by the
+        repo_name step, so it is also run for the user_name step.
+
+        :param steps: step names.
+        :type steps: [str]
+        :returns: failed and skipped steps.
+        :rtype: [str]
+        '''
+
+        steps = list(steps if steps is not None else self.params['rsidentifier'])
+        for step in steps:
+            if step not in self.STEPS:
+                LOGGER.warning('%s: not part of the pipeline, skipped', step)
+        self.steps = set(step for step in steps if step in self.STEPS)
+        pending = [step for step in self.STEPS
+                   if step in self.steps or (step == 'repo_name' and 'user_name' in self.steps)]
+        running = {}
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=len(self.STEPS)) as executor:
+            while pending or running:
+                for step in list(pending):
+                    method, required, budget = self.STEPS[step]
+                    if any(elem in failed for elem in required):
+                        LOGGER.error('%s: skipped, as a required step failed', step)
+                        pending.remove(step)
+                        failed.append(step)
+                        continue
+                    if any(elem in pending or elem in running.values() for elem in required):
+                        continue
+                    budgets = [self.STEPS[elem][2] for elem in running.values()]
+                    if ('exclusive' in budgets or budget in budgets
+                            or (budget == 'exclusive' and budgets)):
+                        continue
+                    pending.remove(step)
+                    running[executor.submit(self.run_step, step)] = step
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    if future.exception():
+                        LOGGER.error('%s: failed', step, exc_info=future.exception())
+                        failed.append(step)
+        return failed
+
+
+
+def main(args=None):
+    '''
+    The function runs the research software identification from the
+    command line, e.g. python -m modules.rs_identifier --steps metadata
+    crossref. It is started in the folder of the configuration file.
+    Several processes, also on different machines, may run the same
+    steps, as the steps claim their entries from the work queue. Entries
+    completed by a preceding run are processed again, if their steps are
+    reset, e.g. with --reset content.
+
+    :param args: command line arguments, by default sys.argv.
+    :type args: [str]
+    :returns: exit code, 1 if a step failed.
+    :rtype: int
+    '''
+
+    parser = argparse.ArgumentParser(
+        description='Identifies research software repositories and their publications.')
+    parser.add_argument('--steps', nargs='+', choices=list(RsIdentifier.STEPS),
+                        help='steps to be run, by default the steps of config.yaml')
+    parser.add_argument('--reset', nargs='+', default=[], choices=list(RsIdentifier.STEPS),
+                        help='steps whose work queue is reset, so completed entries '
+                             'are processed again')
+    parser.add_argument('--log-level', default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    options = parser.parse_args(args)
+    logging.basicConfig(level=options.log_level,
+                        format='%(asctime)s %(threadName)s %(levelname)s %(message)s')
+    identifier = RsIdentifier()
+    for step in options.reset:
+        identifier.work_queue.reset(step)
+    return 1 if identifier.run(options.steps) else 0
+
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+''' This module contains the SubjectIndex class
+    see class doc for more information '''
+
+
+class SubjectIndex():
+    '''
+
+    .. class:: SubjectIndex
+
+    The SubjectIndex class loads the publication subject collection once
+    into hash maps keyed by the normalised ISSN (print and electronic), ISBN
+    (print and electronic), and title (journal title and conference name).
+    Each key refers to the first subject with this key in the collection,
+    as a find_one query with both fields would. ISSNs and ISBNs are
+    normalised without hyphens and blanks, titles without case.
+
+    :param collection: publication subject collection.
+    :type collection: Collection
+    '''
+
+    # fields of the subjects for each kind of key
+    KEY_FIELDS = {'issn': ['print_issn', 'e_issn'],
+                  'isbn': ['print_isbn', 'e_isbn'],
+                  'title': ['title', 'conference_name']}
+    # kind of key for the fields of the Crossref metadata, in the order
+    # in which they are looked up
+    PUBLICATION_FIELDS = [('ISSN', 'issn'), ('ISBN', 'isbn'), ('container-title', 'title')]
+    # subject fields, that are added to the publications and repositories
+    SUBJECT_FIELDS = ['supergroup', 'groups', 'subgroups']
+
+
+    def __init__(self, collection):
+        '''
+        Constructor method
+        '''
+
+        self.maps = {kind: {} for kind in self.KEY_FIELDS}
+        fields = [field for elem in self.KEY_FIELDS.values() for field in elem]
+        for subject in collection.get_entries({}, fields + self.SUBJECT_FIELDS, 1000):
+            for kind, key_fields in self.KEY_FIELDS.items():
+                for field in key_fields:
+                    values = subject.get(field)
+                    for value in values if isinstance(values, list) else [values]:
+                        key = self.normalize(kind, value)
+                        if key:
+                            self.maps[kind].setdefault(key, subject)
+
+
+    @staticmethod
+    def normalize(kind, value):
+        '''
+        The method returns the normalised key of an ISSN, ISBN, or title.
+
+        :param kind: kind of key, issn, isbn, or title.
+        :type kind: str
+        :param value: ISSN, ISBN, or title.
+        :type value: str
+        :returns: normalised key or None for an empty value.
+        :rtype: str
+        '''
+
+        if value is None:
+            return None
+        if kind == 'title':
+            return str(value).strip().lower()
+        return str(value).replace('-', '').replace(' ', '').upper()
+
+
+    def get_subjects(self, pub):
+        '''
+        The method returns the subjects of a publication. They are looked
+        up by its ISSNs, if it has none by its ISBNs, and otherwise by its
+        container titles. A subject is returned for each matching value.
+
+        :param pub: publication with Crossref metadata.
+        :type pub: dict
+        :returns: subjects.
+        :rtype: [dict]
+        '''
+
+        for field, kind in self.PUBLICATION_FIELDS:
+            if field in pub:
+                subjects = [self.maps[kind].get(self.normalize(kind, value))
+                            for value in pub[field]]
+                return [subject for subject in subjects if subject]
+        return []
@@ -0,0 +1,72 @@
+''' This module contains the StubServer class
+    see class doc for more information '''
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer():
+    '''
+
+    .. class:: StubServer
+
+    The StubServer class runs a local HTTP server in a background thread,
+    which stands in for an API in tests. Each request is answered by the
+    handler function with the status code, the response headers, and the
+    JSON body, or the raw body as bytes. All requests are recorded as (method, path, body).
+
+    :param handler: function returning status, headers, and body of a request.
+    :type handler: function
+    '''
+
+    def __init__(self, handler):
+        '''
+        Constructor method
+        '''
+
+        self.handler = handler
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            '''
+            Request handler, that delegates to the handler function.
+            '''
+
+            def log_message(self, *args):
+                pass
+
+            def respond(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                stub.requests.append((method, self.path, body))
+                status, headers, content = stub.handler(method, self.path, body)
+                if not isinstance(content, bytes):
+                    content = json.dumps(content).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self.respond('GET')
+
+            def do_POST(self):
+                self.respond('POST')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d/' % self.server.server_port
+
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,30 @@
+''' Tests of the auxiliary functions '''
+
+import unittest
+from modules import auxiliary_functions as aux
+
+
+class ExtractDoisTest(unittest.TestCase):
+    '''
+    Tests of the DOI extraction of many strings at once.
+    '''
+
+    TEXTS = ['Code of doi:10.5281/zenodo.1 and https://doi.org/abc12 ',
+             None,
+             '',
+             'Doing 2010',
+             'see 10.1000/A.pdf',
+             'ends with doi.org/abc12',
+             '10.1000/b (doi:10/xyz34)\n10.1000/c']
+
+
+    def test_same_as_single(self):
+        self.assertEqual(aux.extract_dois(self.TEXTS),
+                         [aux.extract_doi(text) if text else [] for text in self.TEXTS])
+        self.assertEqual(aux.extract_dois(self.TEXTS)[4], ['10.1000/a'])
+        self.assertEqual(aux.extract_dois([None, 'no DOI']), [[], []])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+''' Tests of the CrossrefClient class against a local stub server '''
+
+import time
+import unittest
+import requests
+from modules.crossref_client import CrossrefClient
+from tests.stub_server import StubServer
+
+
+class RecordingCache():
+    '''
+    DOI cache, that is always empty and records the stored results.
+    '''
+
+    def __init__(self):
+        self.results = []
+
+    @staticmethod
+    def normalize(doi):
+        return doi.lower()
+
+    def get_results(self, kind, dois):
+        return {}
+
+    def save_result(self, kind, doi, status, value=None):
+        self.results.append((kind, doi, status))
+
+
+
+class CrossrefClientTest(unittest.TestCase):
+    '''
+    Tests of the CrossrefClient class.
+    '''
+
+    def get_client(self, server, cache=None):
+        client = CrossrefClient(url=server.url, cache=cache)
+        client.HANDLE_URL = server.url + 'handles/'
+        client.BACKOFF = (0.01, 0.1)
+        client.backoff = client.BACKOFF[0]
+        client.handle_backoff = client.BACKOFF[0]
+        client.MAX_ATTEMPTS = 3
+        return client
+
+
+    def test_back_off(self):
+        responses = [(429, {'Retry-After': '0'}, {}), (503, {}, {})]
+
+        def handler(method, path, body):
+            if responses:
+                return responses.pop(0)
+            return 200, {}, {'message': {'items': [{'DOI': '10.1/A', 'title': ['a']}]}}
+
+        with StubServer(handler) as server:
+            client = self.get_client(server)
+            results = list(client.resolve_all(['10.1/a']))
+            self.assertEqual(results[0][1]['message']['title'], ['a'])
+            self.assertEqual(len(server.requests), 3)
+
+
+    def test_exhausted_attempts(self):
+        with StubServer(lambda method, path, body: (503, {}, {})) as server:
+            cache = RecordingCache()
+            client = self.get_client(server, cache)
+            results = list(client.resolve_all(['10.1/a', '10.1/b.']))
+            self.assertEqual(results, [('10.1/a', None), ('10.1/b.', None)])
+            # neither cached nor resolved by alias or truncation
+            self.assertEqual(cache.results, [])
+            self.assertEqual(len(server.requests), client.MAX_ATTEMPTS)
+
+
+    def test_handle_back_off(self):
+        with StubServer(lambda method, path, body: (503, {}, {})) as server:
+            client = self.get_client(server)
+            with self.assertRaises(requests.exceptions.RetryError):
+                client.get_alias('10.1/a')
+            # the overloaded handle system does not block the Crossref requests
+            self.assertLess(client.rate_limiter.blocked_until, time.time())
+            self.assertEqual(client.backoff, client.BACKOFF[0])
+            self.assertGreater(client.handle_backoff, client.BACKOFF[0])
+
+
+    def test_not_found(self):
+        def handler(method, path, body):
+            if path.startswith('/works?'):
+                return 200, {}, {'message': {'items': []}}
+            return 404, {}, {}
+
+        with StubServer(handler) as server:
+            cache = RecordingCache()
+            client = self.get_client(server, cache)
+            results = list(client.resolve_all(['10.1/a.'], lambda doi: doi == '10.1/a'))
+            self.assertEqual(results[0][1], {'doi': '10.1/a', 'message': None, 'known': True})
+            self.assertIn(('works', '10.1/a.', 404), cache.results)
+            self.assertIn(('alias', '10.1/a.', 404), cache.results)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
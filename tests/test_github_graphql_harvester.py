@@ -0,0 +1,121 @@
+''' Tests of the GitHubGraphQLHarvester class against a local stub server '''
+
+import re
+import unittest
+from modules.github_graphql_harvester import GitHubGraphQLHarvester
+from modules.rate_limiter import RateLimiter, RateLimiterPool
+from tests.stub_server import StubServer
+
+
+def get_repository(owner, name):
+    '''
+    The function returns the GraphQL result of a repository with five commits.
+    '''
+
+    return {'databaseId': 1, 'name': name, 'nameWithOwner': owner + '/' + name,
+            'description': None, 'url': 'https://github.com/' + owner + '/' + name,
+            'createdAt': '2020-01-01T00:00:00Z', 'updatedAt': '2021-01-01T00:00:00Z',
+            'pushedAt': '2021-01-01T00:00:00Z', 'isFork': False, 'isArchived': False,
+            'isDisabled': False, 'stargazerCount': 3, 'forkCount': 1,
+            'owner': {'login': owner, '__typename': 'User'},
+            'primaryLanguage': {'name': 'Python'}, 'licenseInfo': None,
+            'object': {'entries': [{'name': 'README.md'}, {'name': 'setup.py'}]},
+            'defaultBranchRef': {'target': {'oid': 'abc', 'history': {
+                'totalCount': 5,
+                'nodes': [{'author': {'date': '2021-01-01T02:00:00+02:00'}}]}}}}
+
+
+def answer(method, path, body):
+    '''
+    The function answers a GraphQL query with the requested repositories,
+    repositories named missing do not exist.
+    '''
+
+    data = {}
+    for alias, owner, name in re.findall(
+            r'(r\d+): repository\(owner: "([^"]*)", name: "([^"]*)"\)', body['query']):
+        if name == 'missing':
+            data[alias] = None
+        elif 'after:' in body['query']:
+            data[alias] = {'defaultBranchRef': {'target': {'history': {
+                'nodes': [{'author': {'date': '2020-01-01T00:00:00Z'}}]}}}}
+        else:
+            data[alias] = get_repository(owner, name)
+    return 200, {'X-RateLimit-Remaining': '4999'}, {'data': data}
+
+
+class GitHubGraphQLHarvesterTest(unittest.TestCase):
+    '''
+    Tests of the GitHubGraphQLHarvester class.
+    '''
+
+    def get_harvester(self, server):
+        harvester = GitHubGraphQLHarvester('token', url=server.url)
+        harvester.BACKOFF = 0.01
+        # no pacing of the queries to the stub server
+        harvester.rate_limiter = RateLimiterPool({'token': RateLimiter(1000, 1)})
+        return harvester
+
+
+    def test_prefetch(self):
+        with StubServer(answer) as server:
+            harvester = self.get_harvester(server)
+            harvester.prefetch(['a/b', 'a/missing'])
+            response, _ = harvester.get_api_response('metadata', 'a/b', -1)
+            self.assertEqual(response.json()['full_name'], 'a/b')
+            self.assertEqual(response.json()['language'], 'Python')
+            self.assertEqual(harvester.get_first_commit('a/b', -1)[:3],
+                             (False, '2020-01-01T00:00:00Z', '2021-01-01T00:00:00Z'))
+            self.assertFalse(harvester.has_no_possible_source_code_files('a/b', -1)[0])
+            self.assertEqual(harvester.get_api_response('metadata', 'a/missing', -1)[0], None)
+            # two queries, the batch and the first commit
+            self.assertEqual(len(server.requests), 2)
+
+
+    def test_single_lookup_keeps_prefetched(self):
+        with StubServer(answer) as server:
+            harvester = self.get_harvester(server)
+            harvester.prefetch(['a/b'])
+            harvester.get_api_response('metadata', 'a/c', -1)
+            requests = len(server.requests)
+            harvester.get_api_response('metadata', 'a/b', -1)
+            self.assertEqual(len(server.requests), requests)
+
+
+    def test_retry(self):
+        responses = [(502, {}, {}),
+                     (403, {'Retry-After': '0'}, {'message': 'secondary rate limit'}),
+                     (200, {}, {'data': None, 'errors': [{'type': 'RATE_LIMITED'}]})]
+
+        def handler(method, path, body):
+            return responses.pop(0) if responses else answer(method, path, body)
+
+        with StubServer(handler) as server:
+            harvester = self.get_harvester(server)
+            response, _ = harvester.get_api_response('metadata', 'a/b', -1)
+            self.assertEqual(response.json()['full_name'], 'a/b')
+
+
+    def test_exhausted_retries(self):
+        with StubServer(lambda method, path, body: (503, {}, {})) as server:
+            harvester = self.get_harvester(server)
+            harvester.prefetch(['a/b'])
+            self.assertEqual(len(server.requests), harvester.MAX_ATTEMPTS)
+            self.assertNotIn('a/b', harvester.repositories)
+            self.assertTrue(harvester.get_first_commit('a/b', -1)[0])
+
+
+    def test_rejected(self):
+        for status, content in [(401, {'message': 'Bad credentials'}),
+                                (200, {'data': None, 'errors': [{'message': 'syntax error'}]}),
+                                (200, b'<html>Bad Gateway</html>')]:
+            with StubServer(lambda method, path, body: (status, {}, content)) as server:
+                harvester = self.get_harvester(server)
+                harvester.prefetch(['a/b'])
+                self.assertEqual(len(server.requests), 1)
+                self.assertNotIn('a/b', harvester.repositories)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
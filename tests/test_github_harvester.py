@@ -0,0 +1,121 @@
+''' Tests of the GitHubHarvester class '''
+
+import unittest
+from modules.github_harvester import GitHubHarvester
+from modules.http_session import get_session
+from modules.rate_limiter import RateLimiter, RateLimiterPool
+from tests.stub_server import StubServer
+
+
+class KeywordTest(unittest.TestCase):
+    '''
+    Tests of the merged search queries and the attribution of their results.
+    '''
+
+    KEYWORDS = ['doi+10', 'doi+10+in:readme']
+
+
+    def setUp(self):
+        self.harvester = GitHubHarvester()
+
+
+    def test_plan_queries(self):
+        self.assertEqual(self.harvester.plan_queries(self.KEYWORDS),
+                         [('doi+10+in:name,description,topics,readme', self.KEYWORDS)])
+
+
+    def test_match_whole_words(self):
+        match = self.harvester.match_keywords
+        self.assertEqual(match({'description': 'Code of doi:10.5281/zenodo.1'},
+                               self.KEYWORDS), ['doi+10'])
+        self.assertEqual(match({'description': 'DOI_10'}, self.KEYWORDS), ['doi+10'])
+        # found in the Readme file, as the description does not contain the terms
+        self.assertEqual(match({'description': 'Doing 2010'}, self.KEYWORDS),
+                         ['doi+10+in:readme'])
+        self.assertEqual(match({'description': 'Doing 2010'}, self.KEYWORDS,
+                               'see https://doi.org/10.1000/1'),
+                         ['doi+10+in:readme'])
+
+
+    def test_match_readme_keywords(self):
+        match = self.harvester.match_readme_keywords
+        self.assertEqual(match(self.KEYWORDS, ['doi+10'], 'doi: 10.1000/1'),
+                         ['doi+10+in:readme'])
+        self.assertEqual(match(self.KEYWORDS, ['doi+10'], 'Doing 2010'), [])
+        self.assertEqual(match(self.KEYWORDS, self.KEYWORDS, 'doi: 10.1000/1'), [])
+        self.assertEqual(match(self.KEYWORDS, ['software'], 'doi: 10.1000/1'), [])
+
+
+
+class SearchPagesTest(unittest.TestCase):
+    '''
+    Tests of the concurrently requested result pages against a local stub server.
+    '''
+
+    def test_failed_page(self):
+        def handler(method, path, body):
+            if path.endswith('page=3'):
+                return 500, {}, {'message': 'Server Error'}
+            return 200, {'Link': '<%ssearch?q=doi&page=3>; rel="last"' % server.url}, \
+                {'total_count': 300, 'items': [{'id': path}]}
+
+        with StubServer(handler) as server:
+            harvester = GitHubHarvester()
+            # no pacing of the requests to the stub server
+            harvester.rate_limiters['search'] = RateLimiterPool({None: RateLimiter(1000, 1)})
+            response = get_session().get(server.url + 'search?q=doi&page=1')
+            pages = dict(harvester.get_search_pages(response))
+            self.assertEqual(len(pages), 3)
+            self.assertIsNotNone(pages[server.url + 'search?q=doi&page=1'])
+            self.assertIsNotNone(pages[server.url + 'search?q=doi&page=2'])
+            self.assertIsNone(pages[server.url + 'search?q=doi&page=3'])
+            self.assertEqual(list(harvester.get_search_pages(None)), [(None, None)])
+
+
+
+class SearchIntervalsTest(unittest.TestCase):
+    '''
+    Tests of the adaptive search intervals.
+    '''
+
+    def test_failed_first_page(self):
+        harvester = GitHubHarvester()
+        requested = []
+
+        def get_search_results(remaining_requests, next_url, key, interval):
+            requested.append(interval)
+            # the second interval fails, all others are sparse
+            if len(requested) == 2:
+                return None
+            return get_session().get(server.url)
+
+        with StubServer(lambda method, path, body: (200, {}, {'total_count': 10})) as server:
+            harvester.get_search_results = get_search_results
+            intervals = [(interval, response is not None) for interval, response
+                         in harvester.search_intervals('doi', '2020-01-01', '2020-01-20',
+                                                       'days=2')]
+        # the interval after the failed one keeps its size, the next one is doubled
+        self.assertEqual(intervals[:4], [('2020-01-01..2020-01-02', True),
+                                         ('2020-01-03..2020-01-06', False),
+                                         ('2020-01-07..2020-01-10', True),
+                                         ('2020-01-11..2020-01-18', True)])
+
+
+    def test_resume(self):
+        harvester = GitHubHarvester()
+        harvester.get_search_results = lambda remaining_requests, next_url, key, interval: \
+            get_session().get(server.url)
+
+        # the interrupted interval exceeds the limit now, it is not split anyway
+        with StubServer(lambda method, path, body: (200, {}, {'total_count': 2000})) as server:
+            intervals = [interval for interval, _ in harvester.search_intervals(
+                'doi', '2020-01-01', '2020-01-08', 'days=2', '2019-12-31',
+                '2020-01-01..2020-01-04')]
+        # the following intervals are split to single days
+        self.assertEqual(intervals, ['2020-01-01..2020-01-04', '2020-01-05', '2020-01-06',
+                                     '2020-01-07', '2020-01-08'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
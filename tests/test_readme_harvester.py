@@ -0,0 +1,44 @@
+''' Tests of the ReadmeHarvester class against a local stub server '''
+
+import unittest
+from modules.github_harvester import GitHubHarvester
+from modules.http_session import forward, get_session
+from modules.rate_limiter import RateLimiter, RateLimiterPool
+from modules.readme_harvester import ReadmeHarvester
+from tests.stub_server import StubServer
+
+
+class ReadmeHarvesterTest(unittest.TestCase):
+    '''
+    Tests of the Readme file requests.
+    '''
+
+    # response of each repository id
+    RESPONSES = {'1': (200, {}, b'# Readme'),
+                 '2': (404, {}, {'message': 'Not Found'}),
+                 '3': (403, {'X-RateLimit-Remaining': '10'}, {'message': 'Forbidden'}),
+                 '4': (502, {}, {'message': 'Bad Gateway'})}
+
+
+    def tearDown(self):
+        get_session().adapters.pop(GitHubHarvester.BASE_URL, None)
+
+
+    def test_get_readme(self):
+        with StubServer(lambda method, path, body: self.RESPONSES[path.split('/')[2]]
+                        ) as server:
+            forward(GitHubHarvester.BASE_URL, server.url)
+            harvester = GitHubHarvester()
+            # no pacing of the requests to the stub server
+            harvester.rate_limiters['core'] = RateLimiterPool({None: RateLimiter(1000, 1)})
+            readme_harvester = ReadmeHarvester(None, {'github': harvester})
+            readmes = {ident: readme_harvester.get_readme({'id': ident, 'source': 'github'})
+                       for ident in self.RESPONSES}
+            # only a missing Readme file is stored as empty, failed requests are repeated
+            self.assertEqual(readmes, {'1': '# Readme', '2': ReadmeHarvester.EMPTY_README,
+                                       '3': None, '4': None})
+
+
+
+if __name__ == '__main__':
+    unittest.main()